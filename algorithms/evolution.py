@@ -1,5 +1,11 @@
 # algorithms/evolution.py
-import random
+import logging
+import numpy as np
+from algorithms.neural_network import SimpleNeuralNetwork, crossover_genomes, mutate_genomes
+from algorithms.selection import RouletteSelection
+from simulation.profiling import PROFILER
+
+log = logging.getLogger("evolution.algorithm")
 
 class EvolutionAlgorithm:
     def __init__(self):
@@ -10,89 +16,112 @@ class EvolutionAlgorithm:
         self.mutation_rate = self.base_mutation_rate
         self.last_best_fitness = 0
         self.no_improvement_count = 0
+        # Any strategy from algorithms.selection
+        self.selection = RouletteSelection()
+        # Generators for selection/breeding and for genome changes; the
+        # Simulation replaces both with streams derived from its seed
+        self.rng = np.random.default_rng()
+        self.genome_rng = np.random.default_rng()
 
     def evaluate_fitness(self, dots):
         return sorted(dots, key=lambda d: d.food_eaten, reverse=True)
 
+    def select_parents(self, dots, count):
+        fitness = np.fromiter((d.food_eaten for d in dots), dtype=np.float64, count=len(dots))
+        chosen = self.selection.select(fitness, count, self.rng)
+        log.debug("Selected %d parents with %s selection.", len(chosen), self.selection.name)
+        return [dots[i] for i in chosen.tolist()]
+
     def roulette_wheel_selection(self, dots, count):
-        total_fitness = sum(d.food_eaten for d in dots if d.food_eaten > 0)
-        if total_fitness <= 0:
-            print("Total fitness <= 0, selecting parents randomly.")
-            return random.sample(dots, min(count, len(dots)))
-        chosen = []
-        for _ in range(count):
-            pick = random.uniform(0, total_fitness)
-            current = 0
-            for d in dots:
-                if d.food_eaten > 0:
-                    current += d.food_eaten
-                    if current >= pick:
-                        chosen.append(d)
-                        break
-        print(f"Selected {len(chosen)} parents.")
-        return chosen
+        fitness = np.fromiter((d.food_eaten for d in dots), dtype=np.float64, count=len(dots))
+        return [dots[i] for i in RouletteSelection().select(fitness, count, self.rng).tolist()]
 
     def reproduce_population(self, parents):
-        from gui.board import Dot
+        # Elites carry over unchanged; every other child is bred in one pass
+        # over the stacked parent genomes instead of one Dot at a time.
+        from simulation.engine import Dot
+        lap = PROFILER.lap()
         new_population = []
-        top_performers = self.evaluate_fitness(parents)[:self.elite_size]
+        # Parents are drawn with replacement; each elite is carried over once
+        top_performers = list(dict.fromkeys(self.evaluate_fitness(parents)))[:self.elite_size]
         new_population.extend(top_performers)
-        print(f"Added top performers: {len(top_performers)}")
-
-        # Use random.choices to allow parents to be selected multiple times
-        while len(new_population) < self.population_size:
-            if len(parents) == 0:
-                print("No parents available for reproduction.")
-                break
-            # Allow selecting the same parent multiple times
-            p1, p2 = random.choices(parents, k=2)
-            child_net = p1.network.crossover(p1.network, p2.network)
-            child_net.mutate(rate=self.mutation_rate)
-            child_speed = p1.speed + random.uniform(-0.5, 0.5)
-            child_speed = max(0.5, min(child_speed, 5.0))
-            child = Dot(p1.x, p1.y, child_speed, network=child_net, birth_generation=0)  # birth_generation to be set later
-            child.food_eaten = 5
-            new_population.append(child)
-            print(f"Reproduced new dot. Population size: {len(new_population)}")
+        log.debug("Added top performers: %d", len(top_performers))
+
+        n_children = self.population_size - len(new_population)
+        if n_children <= 0:
+            return new_population
+        if len(parents) == 0:
+            log.warning("No parents available for reproduction.")
+            return new_population
+
+        # Parents are drawn uniformly, so the same one can be picked repeatedly
+        first = parents[0].network
+        shape = (first.input_size, first.hidden_size, first.output_size)
+        genomes = np.stack([p.network.genome for p in parents])
+        pairs = self.rng.integers(0, len(parents), size=(n_children, 2))
+        children = crossover_genomes(genomes[pairs[:, 0]], genomes[pairs[:, 1]], *shape, rng=self.genome_rng)
+        if lap is not None:
+            lap("crossover")
+        mutate_genomes(children, rate=self.mutation_rate, rng=self.genome_rng)
+        if lap is not None:
+            lap("mutation")
+
+        speeds = np.fromiter((p.speed for p in parents), dtype=np.float64, count=len(parents))
+        child_speeds = np.clip(speeds[pairs[:, 0]] + self.rng.uniform(-0.5, 0.5, n_children), 0.5, 5.0)
+
+        # Children start where their first parent stands. Parent fields and
+        # ids are read once per parent, then every child is gathered by index.
+        xs = np.fromiter((p.x for p in parents), dtype=np.float64, count=len(parents))
+        ys = np.fromiter((p.y for p in parents), dtype=np.float64, count=len(parents))
+        ids = np.fromiter((p.id for p in parents), dtype=np.int64, count=len(parents))
+        parent_ids = list(zip(ids[pairs[:, 0]].tolist(), ids[pairs[:, 1]].tolist()))
+        networks = SimpleNeuralNetwork.from_genomes(children, *shape)
+        # birth_generation is set by the simulation
+        new_population.extend(Dot.spawn(xs[pairs[:, 0]].tolist(), ys[pairs[:, 0]].tolist(), child_speeds.tolist(),
+                                        networks, parent_ids))
+        log.debug("Reproduced %d new dots. Population size: %d", n_children, len(new_population))
         return new_population
 
     def next_generation(self, dots):
         ranked = self.evaluate_fitness(dots)
         best_fitness = ranked[0].food_eaten if ranked else 0
-        print(f"Generation {self.generation} best fitness: {best_fitness}")
+        log.info("Generation %d best fitness: %s", self.generation, best_fitness)
 
         if best_fitness <= self.last_best_fitness:
             self.no_improvement_count += 1
-            print(f"No improvement. Count: {self.no_improvement_count}")
+            log.debug("No improvement. Count: %d", self.no_improvement_count)
         else:
             self.no_improvement_count = 0
             self.last_best_fitness = best_fitness
-            print("Improvement detected.")
+            log.debug("Improvement detected.")
 
         if self.no_improvement_count > 3:
             self.mutation_rate += 0.05
-            print(f"No improvement for 4 generations. Increasing mutation rate to {self.mutation_rate}")
+            log.info("No improvement for 4 generations. Increasing mutation rate to %s", self.mutation_rate)
         else:
             self.mutation_rate = max(self.base_mutation_rate, self.mutation_rate - 0.01)
-            print(f"Decreasing mutation rate to {self.mutation_rate}")
+            log.debug("Decreasing mutation rate to %s", self.mutation_rate)
 
         if len(dots) == 0:
-            print("No dots remain in the population.")
+            log.warning("No dots remain in the population.")
             return []
 
         requested_parents = max(self.elite_size*2, len(dots)//2)
         requested_parents = min(requested_parents, len(dots))
-        print(f"Requested parents: {requested_parents}")
+        log.debug("Requested parents: %d", requested_parents)
 
         if requested_parents <= 0:
-            print("Requested parents <= 0. Skipping selection.")
+            log.warning("Requested parents <= 0. Skipping selection.")
             return []
 
-        parents = self.roulette_wheel_selection(dots, requested_parents)
+        lap = PROFILER.lap()
+        parents = self.select_parents(dots, requested_parents)
+        if lap is not None:
+            lap("selection")
         if not parents:
-            print("No parents were selected.")
+            log.warning("No parents were selected.")
             return []
 
         new_population = self.reproduce_population(parents)
-        print(f"Next generation population size: {len(new_population)}")
+        log.debug("Next generation population size: %d", len(new_population))
         return new_population
@@ -1,66 +1,200 @@
 # algorithms/neural_network.py
-import math
-import random
+import numpy as np
+
+# Only used when no Generator is passed in; seeded runs always pass one
+_unseeded = np.random.default_rng()
 
 class SimpleNeuralNetwork:
-    def __init__(self, input_size=7, hidden_size=8, output_size=2):
+    # All weights live in one flat float64 genome; w1, b1, w2 and b2 are views
+    # into it, so mutate, copy and crossover only ever touch a single array.
+    __slots__ = ("input_size", "hidden_size", "output_size", "_genome", "_layers")
+
+    def __init__(self, input_size=7, hidden_size=8, output_size=2, genome=None, rng=None):
         self.input_size = input_size
         self.hidden_size = hidden_size
         self.output_size = output_size
 
-        self.w1 = [[random.uniform(-1,1) for _ in range(input_size)] for _ in range(self.hidden_size)]
-        self.b1 = [random.uniform(-1,1) for _ in range(self.hidden_size)]
-        
-        self.w2 = [[random.uniform(-1,1) for _ in range(self.hidden_size)] for _ in range(self.output_size)]
-        self.b2 = [random.uniform(-1,1) for _ in range(self.output_size)]
+        if genome is None:
+            rng = rng if rng is not None else _unseeded
+            genome = rng.uniform(-1, 1, genome_size(input_size, hidden_size, output_size))
+        self.genome = np.asarray(genome, dtype=np.float64)
+
+    @property
+    def genome(self):
+        return self._genome
+
+    @genome.setter
+    def genome(self, values):
+        self._genome = values
+        self._layers = None
+
+    def _split(self):
+        # Layer views are built on first use; bred children that die before
+        # ever moving never pay for them
+        if self._layers is None:
+            values = self._genome
+            i, h, o = self.input_size, self.hidden_size, self.output_size
+            a = h * i
+            b = a + h
+            c = b + o * h
+            self._layers = (values[:a].reshape(h, i), values[a:b], values[b:c].reshape(o, h), values[c:])
+        return self._layers
+
+    @property
+    def w1(self):
+        return self._split()[0]
+
+    @w1.setter
+    def w1(self, values):
+        self._split()[0][...] = values
+
+    @property
+    def b1(self):
+        return self._split()[1]
+
+    @b1.setter
+    def b1(self, values):
+        self._split()[1][...] = values
+
+    @property
+    def w2(self):
+        return self._split()[2]
+
+    @w2.setter
+    def w2(self, values):
+        self._split()[2][...] = values
+
+    @property
+    def b2(self):
+        return self._split()[3]
+
+    @b2.setter
+    def b2(self, values):
+        self._split()[3][...] = values
+
+    @classmethod
+    def from_genomes(cls, genomes, input_size=7, hidden_size=8, output_size=2):
+        # One network per row of an (N, genome) array, each holding a view of
+        # its own row, built without going through __init__
+        genomes = np.ascontiguousarray(genomes, dtype=np.float64)
+        new = object.__new__
+        networks = []
+        for genome in genomes:
+            network = new(cls)
+            network.input_size = input_size
+            network.hidden_size = hidden_size
+            network.output_size = output_size
+            network._genome = genome
+            network._layers = None
+            networks.append(network)
+        return networks
 
     def forward(self, inputs):
-        hidden = []
-        for i in range(self.hidden_size):
-            val = sum(inputs[j]*self.w1[i][j] for j in range(self.input_size)) + self.b1[i]
-            hidden.append(math.tanh(val))
-        
-        output = []
-        for i in range(self.output_size):
-            val = sum(hidden[j]*self.w2[i][j] for j in range(self.hidden_size)) + self.b2[i]
-            output.append(math.tanh(val))
-        return output
-
-    def mutate(self, rate=0.1):
-        def mutate_val(val):
-            if random.random() < 0.1:
-                return val + random.uniform(-rate, rate)
-            return val
-        
-        for i in range(self.hidden_size):
-            for j in range(self.input_size):
-                self.w1[i][j] = mutate_val(self.w1[i][j])
-            self.b1[i] = mutate_val(self.b1[i])
-        
-        for i in range(self.output_size):
-            for j in range(self.hidden_size):
-                self.w2[i][j] = mutate_val(self.w2[i][j])
-            self.b2[i] = mutate_val(self.b2[i])
+        w1, b1, w2, b2 = self._split()
+        hidden = np.tanh(w1 @ np.asarray(inputs, dtype=np.float64) + b1)
+        output = np.tanh(w2 @ hidden + b2)
+        return output.tolist()
+
+    def mutate(self, rate=0.1, rng=None):
+        rng = rng if rng is not None else _unseeded
+        mask = rng.random(self._genome.shape) < 0.1
+        self._genome += mask * rng.uniform(-rate, rate, self._genome.shape)
 
     def copy(self):
-        new_net = SimpleNeuralNetwork(self.input_size, self.hidden_size, self.output_size)
-        new_net.w1 = [row[:] for row in self.w1]
-        new_net.b1 = self.b1[:]
-        new_net.w2 = [row[:] for row in self.w2]
-        new_net.b2 = self.b2[:]
-        return new_net
+        return SimpleNeuralNetwork(self.input_size, self.hidden_size, self.output_size,
+                                   genome=self._genome.copy())
 
     @staticmethod
-    def crossover(parent1, parent2):
+    def crossover(parent1, parent2, rng=None):
+        rng = rng if rng is not None else _unseeded
         child = parent1.copy()
-        crossover_point = random.randint(1, parent1.hidden_size - 1)
-        for i in range(crossover_point, parent1.hidden_size):
-            child.w1[i] = parent2.w1[i][:]
-            child.b1[i] = parent2.b1[i]
+        crossover_point = rng.integers(1, parent1.hidden_size)
+        child.w1[crossover_point:] = parent2.w1[crossover_point:]
+        child.b1[crossover_point:] = parent2.b1[crossover_point:]
 
-        crossover_point2 = random.randint(1, parent1.output_size - 1)
-        for i in range(crossover_point2, parent1.output_size):
-            child.w2[i] = parent2.w2[i][:]
-            child.b2[i] = parent2.b2[i]
+        crossover_point2 = rng.integers(1, parent1.output_size)
+        child.w2[crossover_point2:] = parent2.w2[crossover_point2:]
+        child.b2[crossover_point2:] = parent2.b2[crossover_point2:]
 
         return child
+
+def genome_size(input_size=7, hidden_size=8, output_size=2):
+    return hidden_size * input_size + hidden_size + output_size * hidden_size + output_size
+
+def _gene_rows(input_size, hidden_size, output_size):
+    # For every gene: which layer it belongs to and which output row (neuron)
+    i, h, o = input_size, hidden_size, output_size
+    rows = np.concatenate([np.repeat(np.arange(h), i), np.arange(h),
+                           np.repeat(np.arange(o), h), np.arange(o)])
+    first_layer = np.zeros(len(rows), dtype=bool)
+    first_layer[:h * i + h] = True
+    return rows, first_layer
+
+def crossover_genomes(parents1, parents2, input_size=7, hidden_size=8, output_size=2, rng=None):
+    # Row-wise SimpleNeuralNetwork.crossover for whole (N, genome) arrays: each
+    # child takes the neurons from a random cut point onwards, in both layers,
+    # from its second parent.
+    rng = rng if rng is not None else _unseeded
+    n = len(parents1)
+    rows, first_layer = _gene_rows(input_size, hidden_size, output_size)
+    cut1 = rng.integers(1, hidden_size, n)
+    cut2 = rng.integers(1, output_size, n)
+    cut = np.where(first_layer, cut1[:, None], cut2[:, None])
+    return np.where(rows >= cut, parents2, parents1)
+
+def mutate_genomes(genomes, rate=0.1, rng=None):
+    # In-place SimpleNeuralNetwork.mutate for every row of a genome array;
+    # only the ~10% of genes that mutate draw a perturbation
+    rng = rng if rng is not None else _unseeded
+    mask = rng.random(genomes.shape) < 0.1
+    genomes[mask] += rng.uniform(-rate, rate, np.count_nonzero(mask))
+
+class NetworkBatch:
+    # Stacked weights of a whole population: w1 (N,H,I), b1 (N,H), w2 (N,O,H)
+    # and b2 (N,O). One forward call evaluates every network at once.
+    def __init__(self, genomes, input_size=7, hidden_size=8, output_size=2):
+        self.input_size = input_size
+        self.hidden_size = hidden_size
+        self.output_size = output_size
+        self.genomes = np.ascontiguousarray(genomes, dtype=np.float64)
+
+        n = len(self.genomes)
+        i, h, o = input_size, hidden_size, output_size
+        a = h * i
+        b = a + h
+        c = b + o * h
+        self.w1 = self.genomes[:, :a].reshape(n, h, i)
+        self.b1 = self.genomes[:, a:b]
+        self.w2 = self.genomes[:, b:c].reshape(n, o, h)
+        self.b2 = self.genomes[:, c:]
+
+    def __len__(self):
+        return len(self.genomes)
+
+    @classmethod
+    def from_networks(cls, networks):
+        if not networks:
+            return cls(np.empty((0, genome_size())))
+        first = networks[0]
+        genomes = np.stack([net.genome for net in networks])
+        return cls(genomes, first.input_size, first.hidden_size, first.output_size)
+
+    def forward(self, inputs, rows=None):
+        # inputs is (N,I); rows optionally picks which stacked networks to run.
+        # Inputs with leading axes, e.g. (E,N,I) for E environments, run every
+        # network on its row of each and give (E,N,O).
+        inputs = np.asarray(inputs, dtype=np.float64)
+        if rows is None:
+            w1, b1, w2, b2 = self.w1, self.b1, self.w2, self.b2
+        else:
+            w1, b1, w2, b2 = self.w1[rows], self.b1[rows], self.w2[rows], self.b2[rows]
+        if inputs.ndim > 2:
+            flat = inputs.reshape(-1, *inputs.shape[-2:])
+            outputs = [self._forward(w1, b1, w2, b2, x) for x in flat]
+            return np.stack(outputs).reshape(*inputs.shape[:-1], w2.shape[1])
+        return self._forward(w1, b1, w2, b2, inputs)
+
+    @staticmethod
+    def _forward(w1, b1, w2, b2, inputs):
+        hidden = np.tanh(np.einsum('nhi,ni->nh', w1, inputs) + b1)
+        return np.tanh(np.einsum('noh,nh->no', w2, hidden) + b2)
@@ -0,0 +1,71 @@
+# algorithms/selection.py
+import logging
+import numpy as np
+
+log = logging.getLogger("evolution.algorithm")
+
+# Every strategy maps a fitness array (one value per candidate) to `count`
+# candidate indices, sampled with replacement from the Generator it is given.
+
+class RouletteSelection:
+    # Fitness-proportionate: one cumulative-weight array per call, then a
+    # binary search per pick. Candidates with no positive fitness are never
+    # picked; if nobody has any, parents are sampled uniformly without
+    # replacement instead.
+    name = "roulette"
+
+    def select(self, fitness, count, rng):
+        fitness = np.asarray(fitness, dtype=np.float64)
+        weights = np.where(fitness > 0, fitness, 0.0)
+        cumulative = np.cumsum(weights)
+        total = cumulative[-1] if len(cumulative) else 0.0
+        if total <= 0:
+            log.info("Total fitness <= 0, selecting parents randomly.")
+            return rng.permutation(len(fitness))[:count]
+        picks = rng.uniform(0, total, count)
+        return np.minimum(np.searchsorted(cumulative, picks, side="left"), len(fitness) - 1)
+
+class TournamentSelection:
+    # Each pick is the fittest of `size` candidates drawn uniformly
+    name = "tournament"
+
+    def __init__(self, size=3):
+        self.size = size
+
+    def select(self, fitness, count, rng):
+        fitness = np.asarray(fitness, dtype=np.float64)
+        if not len(fitness):
+            return np.empty(0, dtype=np.intp)
+        entrants = rng.integers(0, len(fitness), size=(count, self.size))
+        winners = np.argmax(fitness[entrants], axis=1)
+        return entrants[np.arange(count), winners]
+
+class RankSelection:
+    # Linear ranking: selection probability depends only on rank, from
+    # (2 - pressure) / n for the worst to pressure / n for the best, so a few
+    # outliers cannot take over the parent pool.
+    name = "rank"
+
+    def __init__(self, pressure=1.5):
+        self.pressure = pressure
+
+    def select(self, fitness, count, rng):
+        fitness = np.asarray(fitness, dtype=np.float64)
+        n = len(fitness)
+        if n == 0:
+            return np.empty(0, dtype=np.intp)
+        if n == 1:
+            return np.zeros(count, dtype=np.intp)
+        order = np.argsort(fitness, kind="stable")
+        ranks = np.arange(n, dtype=np.float64)
+        weights = (2 - self.pressure) / n + 2 * ranks * (self.pressure - 1) / (n * (n - 1))
+        cumulative = np.cumsum(weights)
+        picks = rng.uniform(0, cumulative[-1], count)
+        return order[np.minimum(np.searchsorted(cumulative, picks, side="left"), n - 1)]
+
+SELECTIONS = {cls.name: cls for cls in (RouletteSelection, TournamentSelection, RankSelection)}
+
+def make_selection(name, **options):
+    if name not in SELECTIONS:
+        raise ValueError(f"Unknown selection strategy {name!r}; choose from {', '.join(SELECTIONS)}")
+    return SELECTIONS[name](**options)
@@ -0,0 +1,70 @@
+# benchmarks/food_index.py
+import argparse
+import random
+import time
+from algorithms.neural_network import SimpleNeuralNetwork
+from simulation.engine import Dot, Food, Simulation
+from simulation.log import quiet
+
+def build_simulation(num_dots, num_foods, width, height, output_csv="simulation_report.csv", seed=0):
+    sim = Simulation(width, height, output_csv=output_csv, lineage=False, seed=seed)
+    Dot._id_counter = 0
+    for _ in range(num_dots):
+        dot = Dot(random.uniform(0, width), random.uniform(0, height), random.uniform(1, 3),
+                  network=SimpleNeuralNetwork(rng=sim.rng.genome), birth_generation=sim.algorithm.generation)
+        sim.lineage.add(dot)
+        sim.dots.append(dot)
+    sim.pending_log_ids = set(d.id for d in sim.dots)
+    for _ in range(num_foods):
+        sim.foods.append(Food(random.randint(0, width - 1), random.randint(0, height - 1)))
+    return sim
+
+def time_steps(sim, steps):
+    with quiet():
+        start = time.perf_counter()
+        for _ in range(steps):
+            sim.step()
+        return (time.perf_counter() - start) / steps
+
+def time_linear_queries(sim, sample):
+    # What the old list scan cost per dot: one min() plus one radius-50 count
+    foods = list(sim.foods)
+    dots = sim.dots[:sample]
+    start = time.perf_counter()
+    for dot in dots:
+        min(foods, key=lambda f: (f.x - dot.x)**2 + (f.y - dot.y)**2)
+        sum(1 for f in foods if (f.x - dot.x)**2 + (f.y - dot.y)**2 < 2500)
+    return (time.perf_counter() - start) / max(len(dots), 1)
+
+def time_grid_queries(sim, sample):
+    dots = sim.dots[:sample]
+    start = time.perf_counter()
+    for dot in dots:
+        sim.foods.nearest(dot.x, dot.y)
+        sim.foods.count_within(dot.x, dot.y, 50)
+    return (time.perf_counter() - start) / max(len(dots), 1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Food index scaling benchmark")
+    parser.add_argument("--dots", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--foods", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--steps", type=int, default=3)
+    parser.add_argument("--sample", type=int, default=200,
+                        help="dots used to time the linear scan, extrapolated to the population")
+    parser.add_argument("--width", type=int, default=3000)
+    parser.add_argument("--height", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'dots':>7} {'foods':>7} {'step ms':>10} {'grid query us':>14} {'linear query us':>16} {'linear step ms (est)':>21}")
+    for num_foods in args.foods:
+        for num_dots in args.dots:
+            random.seed(0)
+            sim = build_simulation(num_dots, num_foods, args.width, args.height)
+            grid_query = time_grid_queries(sim, args.sample)
+            linear_query = time_linear_queries(sim, args.sample)
+            step = time_steps(sim, args.steps)
+            print(f"{num_dots:>7} {num_foods:>7} {step * 1e3:>10.1f} {grid_query * 1e6:>14.1f} "
+                  f"{linear_query * 1e6:>16.1f} {linear_query * num_dots * 1e3:>21.1f}")
+
+if __name__ == "__main__":
+    main()
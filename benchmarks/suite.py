@@ -0,0 +1,195 @@
+# benchmarks/suite.py
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import numpy as np
+from algorithms.neural_network import NetworkBatch, SimpleNeuralNetwork
+from benchmarks.food_index import build_simulation
+from simulation.engine import Food, Simulation
+from simulation.log import quiet
+
+def seed(value):
+    random.seed(value)
+    np.random.seed(value)
+
+def measure(fn, min_time=0.5, max_runs=1000):
+    # Seconds per call of fn, repeating until min_time has passed
+    runs = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while runs < max_runs and (runs == 0 or elapsed < min_time):
+        fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+    return elapsed / runs, runs
+
+def result(seconds, runs, unit, per_op=1, **params):
+    return {
+        "seconds": seconds,
+        "per_second": per_op / seconds if seconds > 0 else float("inf"),
+        "unit": unit,
+        "runs": runs,
+        "params": params,
+    }
+
+# Steps timed on one freshly built world before it is rebuilt. Every dot
+# starts with 5 food and loses at most ~0.1 a step, so none can die this soon.
+STEPS_PER_WORLD = 10
+
+def bench_steps(population, foods, min_time, max_runs=1000):
+    # Times move_dots at the nominal size: eaten food is put back between
+    # steps and the world is rebuilt every STEPS_PER_WORLD steps, both
+    # outside the timed region
+    seed(1)
+    rng = random.Random(1)
+    elapsed = 0.0
+    runs = 0
+    while runs < max_runs and (runs == 0 or elapsed < min_time):
+        sim = build_simulation(population, foods, 600, 400, seed=1)
+        for _ in range(STEPS_PER_WORLD):
+            start = time.perf_counter()
+            sim.move_dots()
+            elapsed += time.perf_counter() - start
+            runs += 1
+            for _ in range(foods - len(sim.foods)):
+                sim.foods.append(Food(rng.randint(0, 599), rng.randint(0, 399)))
+        assert len(sim.dots) == population, "dots died during a step benchmark"
+        sim.close()
+    return result(elapsed / runs, runs, "steps", population=population, foods=foods)
+
+def bench_generations(population, workdir, min_time):
+    seed(2)
+    sim = build_simulation(population, 50, 600, 400,
+                           output_csv=os.path.join(workdir, f"generations_{population}.csv"), seed=2)
+    sim.algorithm.population_size = population
+
+    def one_generation():
+        # Give every dot a fitness so selection has real work to do
+        for dot in sim.dots:
+            dot.food_eaten = random.uniform(0, 20)
+        sim.end_generation()
+    seconds, runs = measure(one_generation, min_time)
+    sim.close()
+    return result(seconds, runs, "generations", population=population)
+
+def bench_network(population, min_time):
+    seed(3)
+    rng = np.random.default_rng(3)
+    networks = [SimpleNeuralNetwork(rng=rng) for _ in range(population)]
+    inputs = np.random.random((population, 7))
+    batch = NetworkBatch.from_networks(networks)
+    results = {}
+
+    seconds, runs = measure(lambda: [n.forward(x) for n, x in zip(networks, inputs)], min_time)
+    results[f"forward/pop={population}"] = result(seconds, runs, "forwards", population, population=population)
+
+    seconds, runs = measure(lambda: batch.forward(inputs), min_time)
+    results[f"batch_forward/pop={population}"] = result(seconds, runs, "forwards", population, population=population)
+
+    seconds, runs = measure(lambda: [n.mutate(0.1, rng) for n in networks], min_time)
+    results[f"mutate/pop={population}"] = result(seconds, runs, "mutations", population, population=population)
+
+    pairs = [(random.choice(networks), random.choice(networks)) for _ in range(population)]
+    seconds, runs = measure(lambda: [SimpleNeuralNetwork.crossover(a, b, rng) for a, b in pairs], min_time)
+    results[f"crossover/pop={population}"] = result(seconds, runs, "crossovers", population, population=population)
+    return results
+
+def bench_csv(rows, workdir, min_time):
+    record = {
+        "generation": 1, "dot_id": 0, "food_eaten": 1.5, "highest_food": 7.25, "food_when_died": None,
+        "lifetime_steps": 1000, "status": "Alive", "generation_created": 1,
+    }
+    sim = Simulation(output_csv=os.path.join(workdir, f"csv_{rows}.csv"), lineage=False, seed=4)
+
+    def write():
+        sim.experiment_data = [dict(record, dot_id=i) for i in range(rows)]
+        sim.write_to_csv()
+        sim.report.flush()
+    seconds, runs = measure(write, min_time)
+    sim.close()
+    return result(seconds, runs, "rows", rows, rows=rows)
+
+def run_suite(populations, foods, min_time):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for population in populations:
+            for food in foods:
+                with quiet():
+                    results[f"step/pop={population}/foods={food}"] = bench_steps(population, food, min_time)
+                print_result(f"step/pop={population}/foods={food}", results)
+            with quiet():
+                results[f"generation/pop={population}"] = bench_generations(population, workdir, min_time)
+            print_result(f"generation/pop={population}", results)
+            network_results = bench_network(population, min_time)
+            results.update(network_results)
+            for name in network_results:
+                print_result(name, results)
+            with quiet():
+                results[f"write_to_csv/rows={population}"] = bench_csv(population, workdir, min_time)
+            print_result(f"write_to_csv/rows={population}", results)
+    return results
+
+def print_result(name, results):
+    r = results[name]
+    print(f"{name:<36} {r['seconds'] * 1e3:>12.3f} ms {r['per_second']:>14.1f} {r['unit']}/s")
+
+def compare(results, baseline, tolerance):
+    # Names whose throughput dropped by more than `tolerance` against the baseline
+    regressions = []
+    print(f"\n{'benchmark':<36} {'baseline/s':>14} {'current/s':>14} {'change':>8}")
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["per_second"]
+        after = current["per_second"]
+        change = after / before - 1 if before else 0.0
+        flag = ""
+        if change < -tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<36} {before:>14.1f} {after:>14.1f} {change:>+7.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulation benchmark suite")
+    parser.add_argument("--populations", type=int, nargs="+", default=[20, 200, 2000, 20000])
+    parser.add_argument("--foods", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--min-time", type=float, default=0.5,
+                        help="seconds to repeat each measurement for")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed throughput drop before a benchmark counts as a regression")
+    args = parser.parse_args()
+
+    results = run_suite(args.populations, args.foods, args.min_time)
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "populations": args.populations,
+            "foods": args.foods,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}.")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} benchmarks regressed by more than {args.tolerance:.0%}.")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,17 @@
 # gui/main_window.py
-from PyQt5.QtWidgets import QMainWindow, QVBoxLayout, QPushButton, QWidget, QLabel, QHBoxLayout
+from PyQt5.QtWidgets import QMainWindow, QVBoxLayout, QPushButton, QWidget, QLabel, QHBoxLayout, QTableView, QHeaderView
+from PyQt5.QtCore import Qt, QTimer, QSortFilterProxyModel
 from gui.board import Board
+from gui.stats_model import DotStatsModel, SORT_ROLE
+from simulation.log import get_logger
+
+log = get_logger("gui")
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    STATS_REFRESH_MS = 250
+    REPLAY_PATH = "simulation_replay.bin"
+
+    def __init__(self, seed=None):
         super().__init__()
 
         self.setWindowTitle("Evolution Project")
@@ -14,26 +22,51 @@ class MainWindow(QMainWindow):
 
         self.layout = QVBoxLayout(self.central_widget)
 
-        self.board = Board()
+        self.board = Board(seed)
         self.layout.addWidget(self.board)
 
         btn_layout = QHBoxLayout()
         self.start_button = QPushButton("Start Evolution", self)
         self.start_button.clicked.connect(self.start_evolution)
         btn_layout.addWidget(self.start_button)
+        self.turbo_button = QPushButton("Turbo", self)
+        self.turbo_button.setCheckable(True)
+        self.turbo_button.toggled.connect(self.board.set_turbo)
+        btn_layout.addWidget(self.turbo_button)
+        self.record_button = QPushButton("Record", self)
+        self.record_button.setCheckable(True)
+        self.record_button.toggled.connect(self.set_recording)
+        btn_layout.addWidget(self.record_button)
 
         self.layout.addLayout(btn_layout)
 
-        self.stats_labels = []
-        self.stats_layout = QVBoxLayout()
-        self.layout.addLayout(self.stats_layout)
+        self.stats_model = DotStatsModel(self)
+        self.stats_proxy = QSortFilterProxyModel(self)
+        self.stats_proxy.setSourceModel(self.stats_model)
+        self.stats_proxy.setSortRole(SORT_ROLE)
+        self.stats_proxy.setDynamicSortFilter(True)
+        self.stats_view = QTableView(self)
+        self.stats_view.setModel(self.stats_proxy)
+        self.stats_view.setSortingEnabled(True)
+        self.stats_view.sortByColumn(1, Qt.DescendingOrder)
+        self.stats_view.verticalHeader().hide()
+        self.stats_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.layout.addWidget(self.stats_view)
+
+        # The board reports every tick; the table only refreshes at a fixed rate
+        self.stats_dirty = False
+        self.stats_timer = QTimer(self)
+        self.stats_timer.timeout.connect(self.refresh_stats)
+        self.stats_timer.start(self.STATS_REFRESH_MS)
 
         self.generation_label = QLabel("Generation: 1", self)
         self.best_fitness_label = QLabel("Best Fitness: 0", self)
+        self.summary_label = QLabel("", self)
         self.layout.addWidget(self.generation_label)
         self.layout.addWidget(self.best_fitness_label)
+        self.layout.addWidget(self.summary_label)
 
-        self.board.dots_updated.connect(self.update_stats)
+        self.board.dots_updated.connect(self.mark_stats_dirty)
         self.board.generation_updated.connect(self.update_generation_info)
 
     def start_evolution(self):
@@ -41,22 +74,44 @@ class MainWindow(QMainWindow):
         self.board.add_food(20)
         self.board.start_food_timer(5000)
         self.board.start_food_depletion_timer(20000)
+        # Start stepping only once the world is set up, so a seed gives the same run as headless
+        self.board.start()
         self.update_stats()
-        print("Evolution started.")
+        log.info("Evolution started.")
+
+    def set_recording(self, enabled):
+        if enabled:
+            self.board.start_recording(self.REPLAY_PATH)
+        else:
+            self.board.stop_recording()
+
+    def mark_stats_dirty(self):
+        self.stats_dirty = True
+
+    def refresh_stats(self):
+        if self.stats_dirty:
+            self.update_stats()
 
     def update_stats(self):
-        for label in self.stats_labels:
-            self.stats_layout.removeWidget(label)
-            label.deleteLater()
+        self.stats_dirty = False
+        with self.board.buffer.read() as frame:
+            self.stats_model.update_rows(frame.dot_ids.tolist(), frame.dot_food.tolist(),
+                                         frame.dot_highest.tolist())
 
-        self.stats_labels = []
-        for i, dot in enumerate(self.board.dots):
-            status = "Dead" if dot.food_eaten <= 0 else f"Food: {dot.food_eaten:.2f}"
-            label = QLabel(f"Dot #{i + 1} {status}", self)
-            self.stats_labels.append(label)
-            self.stats_layout.addWidget(label)
+    def closeEvent(self, event):
+        self.board.stop()
+        self.board.simulation.close()
+        super().closeEvent(event)
 
     def update_generation_info(self, generation, best_fitness):
         self.generation_label.setText(f"Generation: {generation}")
         self.best_fitness_label.setText(f"Best Fitness: {best_fitness:.2f}")
-        print(f"Updated UI: Generation {generation}, Best Fitness {best_fitness}")
+        # Aggregates of the generation that just ended, kept by the simulation as it runs
+        summary = self.board.simulation.summary.latest
+        if summary is not None and summary["food_eaten"]["count"]:
+            food = summary["food_eaten"]
+            self.summary_label.setText(
+                f"Last generation: {summary['alive']}/{summary['population']} alive, "
+                f"food mean {food['mean']:.2f} (median {food['quantiles']['0.5']:.2f}, "
+                f"{summary['reason']} after {summary['steps']} steps)")
+        log.debug("Updated UI: Generation %d, Best Fitness %s", generation, best_fitness)
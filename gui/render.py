@@ -0,0 +1,135 @@
+# gui/render.py
+import numpy as np
+from PyQt5.QtGui import QPainter, QPixmap, QPolygonF, QPen, QColor
+from PyQt5.QtCore import Qt, QPointF, QRectF, QRect
+
+GLYPH_SIZE = 11
+# Offset from an object's position to the top-left of its glyph. Dots are
+# drawn below-right of their position, food triangles sit on top of it.
+DOT_OFFSET = (0, 0)
+FOOD_OFFSET = (0, -10)
+
+# Keys pack integer pixel positions into one int64 so frames can be diffed
+# with set operations regardless of the order objects are listed in.
+_KEY_BIAS = 1 << 20
+_KEY_SCALE = 1 << 21
+
+def _keys(xy):
+    if not len(xy):
+        return np.empty(0, dtype=np.int64)
+    ixy = xy.astype(np.int64) + _KEY_BIAS
+    return np.unique(ixy[:, 0] * _KEY_SCALE + ixy[:, 1])
+
+def _positions(keys):
+    x, y = np.divmod(keys, _KEY_SCALE)
+    return x - _KEY_BIAS, y - _KEY_BIAS
+
+def make_glyph(kind, device_pixel_ratio=1.0):
+    pixmap = QPixmap(int(GLYPH_SIZE * device_pixel_ratio), int(GLYPH_SIZE * device_pixel_ratio))
+    pixmap.setDevicePixelRatio(device_pixel_ratio)
+    pixmap.fill(Qt.transparent)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setPen(Qt.NoPen)
+    if kind == "dot":
+        painter.setBrush(Qt.gray)
+        painter.drawEllipse(0, 0, 10, 10)
+    else:
+        painter.setBrush(Qt.green)
+        painter.drawPolygon(QPointF(0, 10), QPointF(10, 10), QPointF(5, 0))
+    painter.end()
+    return pixmap
+
+def point_polygon(xy):
+    # Fills a QPolygonF straight from the array instead of building QPointFs
+    polygon = QPolygonF(len(xy))
+    if len(xy):
+        buffer = polygon.data()
+        buffer.setsize(len(xy) * 16)
+        np.frombuffer(buffer, dtype=np.float64).reshape(-1, 2)[:] = xy
+    return polygon
+
+class BoardRenderer:
+    # Draws a frame of dots and food with cached glyph pixmaps. set_frame()
+    # copies the frame and returns the rectangles that changed since the last
+    # one, so the board can repaint just those; draw() then blits every glyph
+    # inside the exposed rectangle in a single drawPixmapFragments call per
+    # kind. Above `lod_threshold` visible objects (or always, with lod="on")
+    # glyphs are replaced by plain points.
+    MAX_DIRTY_RECTS = 256
+
+    def __init__(self, lod="auto", lod_threshold=2000):
+        self.lod = lod
+        self.lod_threshold = lod_threshold
+        self.dot_xy = np.empty((0, 2), dtype=np.float64)
+        self.food_xy = np.empty((0, 2), dtype=np.float64)
+        self._dot_keys = _keys(self.dot_xy)
+        self._food_keys = _keys(self.food_xy)
+        self._glyphs = {}
+        self._dpr = None
+
+    def glyph(self, kind, device_pixel_ratio):
+        if device_pixel_ratio != self._dpr:
+            self._glyphs.clear()
+            self._dpr = device_pixel_ratio
+        if kind not in self._glyphs:
+            self._glyphs[kind] = make_glyph(kind, device_pixel_ratio)
+        return self._glyphs[kind]
+
+    def use_lod(self):
+        if self.lod == "on":
+            return True
+        if self.lod == "off":
+            return False
+        return len(self.dot_xy) + len(self.food_xy) > self.lod_threshold
+
+    def set_frame(self, dot_xy, food_xy):
+        # Returns a list of dirty QRects, or None when a full repaint is cheaper
+        self.dot_xy = np.array(dot_xy, dtype=np.float64)
+        self.food_xy = np.array(food_xy, dtype=np.float64)
+        dot_keys, food_keys = _keys(self.dot_xy), _keys(self.food_xy)
+        changed_dots = np.setxor1d(self._dot_keys, dot_keys, assume_unique=True)
+        changed_food = np.setxor1d(self._food_keys, food_keys, assume_unique=True)
+        self._dot_keys, self._food_keys = dot_keys, food_keys
+
+        if len(changed_dots) + len(changed_food) > self.MAX_DIRTY_RECTS:
+            return None
+        rects = []
+        for keys, (dx, dy) in ((changed_dots, DOT_OFFSET), (changed_food, FOOD_OFFSET)):
+            xs, ys = _positions(keys)
+            for x, y in zip(xs.tolist(), ys.tolist()):
+                rects.append(QRect(x + dx - 1, y + dy - 1, GLYPH_SIZE + 2, GLYPH_SIZE + 2))
+        return rects
+
+    def draw(self, painter, exposed):
+        dot_xy = self._clip(self.dot_xy, DOT_OFFSET, exposed)
+        food_xy = self._clip(self.food_xy, FOOD_OFFSET, exposed)
+        if self.use_lod():
+            painter.setPen(QPen(QColor(Qt.green), 3))
+            painter.drawPoints(point_polygon(food_xy + (5, -5)))
+            painter.setPen(QPen(QColor(Qt.gray), 3))
+            painter.drawPoints(point_polygon(dot_xy + 5))
+            return
+
+        dpr = painter.device().devicePixelRatioF()
+        source = QRectF(0, 0, GLYPH_SIZE, GLYPH_SIZE)
+        half = GLYPH_SIZE / 2
+        for xy, (dx, dy), kind in ((dot_xy, DOT_OFFSET, "dot"), (food_xy, FOOD_OFFSET, "food")):
+            if not len(xy):
+                continue
+            # Fragments are positioned by their centre; snap to whole pixels like the old int() casts
+            centres = np.floor(xy) + (dx + half, dy + half)
+            fragments = [QPainter.PixmapFragment.create(QPointF(x, y), source)
+                         for x, y in centres.tolist()]
+            painter.drawPixmapFragments(fragments, self.glyph(kind, dpr))
+
+    @staticmethod
+    def _clip(xy, offset, exposed):
+        if not len(xy):
+            return xy
+        left = exposed.left() - GLYPH_SIZE - offset[0]
+        top = exposed.top() - GLYPH_SIZE - offset[1]
+        right = exposed.right() + 1 - offset[0]
+        bottom = exposed.bottom() + 1 - offset[1]
+        inside = (xy[:, 0] >= left) & (xy[:, 0] <= right) & (xy[:, 1] >= top) & (xy[:, 1] <= bottom)
+        return xy[inside]
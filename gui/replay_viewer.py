@@ -0,0 +1,82 @@
+# gui/replay_viewer.py
+from PyQt5.QtWidgets import QMainWindow, QVBoxLayout, QHBoxLayout, QPushButton, QWidget, QLabel, QSlider, QSpinBox
+from PyQt5.QtCore import Qt, QTimer
+from gui.board import Board
+from simulation.log import get_logger
+from simulation.replay import ReplayReader
+
+log = get_logger("gui")
+
+class ReplayViewer(QMainWindow):
+    # Plays a recording through the normal Board painting. The board's own
+    # simulation is never started; frames are decoded from the replay file.
+    def __init__(self, path):
+        super().__init__()
+        self.reader = ReplayReader(path)
+
+        self.setWindowTitle(f"Evolution Replay - {path}")
+        self.central_widget = QWidget()
+        self.setCentralWidget(self.central_widget)
+        self.layout = QVBoxLayout(self.central_widget)
+
+        self.board = Board()
+        self.board.frame_timer.stop()
+        self.board.setMinimumSize(self.reader.width, self.reader.height)
+        self.layout.addWidget(self.board)
+
+        self.slider = QSlider(Qt.Horizontal, self)
+        self.slider.setRange(0, max(len(self.reader) - 1, 0))
+        self.slider.valueChanged.connect(self.show_frame)
+        self.layout.addWidget(self.slider)
+
+        controls = QHBoxLayout()
+        self.play_button = QPushButton("Play", self)
+        self.play_button.setCheckable(True)
+        self.play_button.toggled.connect(self.set_playing)
+        controls.addWidget(self.play_button)
+
+        controls.addWidget(QLabel("Go to step:", self))
+        self.step_box = QSpinBox(self)
+        if len(self.reader):
+            self.step_box.setRange(int(self.reader.index["total_step"][0]), int(self.reader.index["total_step"][-1]))
+        self.step_box.editingFinished.connect(self.go_to_step)
+        controls.addWidget(self.step_box)
+
+        self.position_label = QLabel(self)
+        controls.addWidget(self.position_label)
+        self.layout.addLayout(controls)
+
+        self.play_timer = QTimer(self)
+        self.play_timer.timeout.connect(self.advance)
+
+        if len(self.reader):
+            self.show_frame(0)
+        log.info("Opened replay %s with %d frames.", path, len(self.reader))
+
+    def show_frame(self, i):
+        frame = self.reader.frame(i)
+        self.board.show_frame(frame.dot_xy[frame.alive], frame.food_xy)
+        self.position_label.setText(f"Generation: {frame.generation}  Step: {frame.step}  "
+                                    f"Dots: {int(frame.alive.sum())}  Food: {len(frame.food_xy)}")
+
+    def set_playing(self, playing):
+        if playing:
+            self.play_timer.start(Board.STEP_INTERVAL_MS)
+        else:
+            self.play_timer.stop()
+        self.play_button.setText("Pause" if playing else "Play")
+
+    def advance(self):
+        if self.slider.value() >= self.slider.maximum():
+            self.play_button.setChecked(False)
+            return
+        self.slider.setValue(self.slider.value() + 1)
+
+    def go_to_step(self):
+        self.slider.setValue(self.reader.find(self.step_box.value()))
+
+    def closeEvent(self, event):
+        self.play_timer.stop()
+        self.board.simulation.close()
+        self.reader.close()
+        super().closeEvent(event)
@@ -0,0 +1,57 @@
+# gui/sim_thread.py
+import threading
+import time
+from PyQt5.QtCore import QThread
+from simulation.log import get_logger
+
+log = get_logger("gui")
+
+class SimulationWorker(QThread):
+    # Steps the simulation on its own thread and publishes frames into a
+    # SnapshotBuffer at most `publish_fps` times a second. Anything else that
+    # touches the simulation must hold `lock`.
+    def __init__(self, simulation, buffer, step_interval_ms=100, publish_fps=30, parent=None):
+        super().__init__(parent)
+        self.simulation = simulation
+        self.buffer = buffer
+        self.lock = threading.Lock()
+        self.step_interval_ms = step_interval_ms
+        self.publish_interval = 1.0 / publish_fps
+        self.turbo = False
+        self._running = False
+
+    def set_turbo(self, enabled):
+        # Turbo runs flat out and publishes nothing; only generation summaries
+        # reach the GUI through the simulation's generation listeners.
+        self.turbo = enabled
+        log.info("Turbo mode %s.", "on" if enabled else "off")
+
+    def set_step_interval(self, ms):
+        self.step_interval_ms = ms
+
+    def stop(self):
+        self._running = False
+        self.wait()
+
+    def run(self):
+        self._running = True
+        next_step = time.perf_counter()
+        last_publish = 0.0
+        while self._running:
+            with self.lock:
+                self.simulation.tick()
+
+            now = time.perf_counter()
+            if not self.turbo and now - last_publish >= self.publish_interval:
+                with self.lock:
+                    self.buffer.publish(self.simulation)
+                last_publish = now
+
+            if self.turbo or not self.step_interval_ms:
+                continue
+            next_step += self.step_interval_ms / 1000.0
+            delay = next_step - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_step = time.perf_counter()
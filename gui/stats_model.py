@@ -0,0 +1,87 @@
+# gui/stats_model.py
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+SORT_ROLE = Qt.UserRole
+
+class DotStatsModel(QAbstractTableModel):
+    # One row per living dot. update_dots() diffs the new population against
+    # the rows already shown: deaths remove rows, changed values only emit
+    # dataChanged for the rows that moved, and only a new generation resets.
+    HEADERS = ["Dot", "Food", "Highest food"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._ids = []
+        self._rows = []
+        self._row_of = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self._rows[index.row()][index.column()]
+        if role == SORT_ROLE:
+            return value
+        if role == Qt.DisplayRole:
+            if index.column() == 0:
+                return f"Dot #{value}"
+            return f"{value:.2f}"
+        if role == Qt.TextAlignmentRole and index.column() > 0:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def update_dots(self, dots):
+        self.update_rows([d.id for d in dots], [d.food_eaten for d in dots],
+                         [d.max_food_eaten for d in dots])
+
+    def update_rows(self, ids, food, highest):
+        # Column-wise form of update_dots, fed from a published Snapshot
+        ids = list(ids)
+        rows = list(zip(ids, food, highest))
+        if ids != self._ids:
+            if set(ids) <= set(self._row_of):
+                self._remove_missing(set(ids))
+            if ids != self._ids:
+                self.beginResetModel()
+                self._ids = ids
+                self._rows = rows
+                self._row_of = {dot_id: row for row, dot_id in enumerate(ids)}
+                self.endResetModel()
+                return
+
+        first = last = None
+        for row, values in enumerate(rows):
+            if self._rows[row] != values:
+                self._rows[row] = values
+                if first is None:
+                    first = row
+                last = row
+        if first is not None:
+            self.dataChanged.emit(self.index(first, 1), self.index(last, len(self.HEADERS) - 1),
+                                  [Qt.DisplayRole, SORT_ROLE])
+
+    def _remove_missing(self, keep):
+        # Walk backwards so earlier row numbers stay valid while removing
+        row = len(self._ids) - 1
+        while row >= 0:
+            if self._ids[row] in keep:
+                row -= 1
+                continue
+            end = row
+            while row >= 0 and self._ids[row] not in keep:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row + 1, end)
+            del self._ids[row + 1:end + 1]
+            del self._rows[row + 1:end + 1]
+            self.endRemoveRows()
+        self._row_of = {dot_id: i for i, dot_id in enumerate(self._ids)}
@@ -1,11 +1,218 @@
 # main.py
+import argparse
 import sys
-from PyQt5.QtWidgets import QApplication
-from gui.main_window import MainWindow
+from simulation.log import configure_logging, get_logger
 
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    main_window = MainWindow()
+log = get_logger("main")
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Evolution Project")
+    parser.add_argument("--headless", action="store_true",
+                        help="run the simulation without a window")
+    parser.add_argument("--generations", type=int, default=10,
+                        help="number of generations to run in headless mode")
+    parser.add_argument("--width", type=int, default=600)
+    parser.add_argument("--height", type=int, default=400)
+    parser.add_argument("--output", default="simulation_report.csv",
+                        help="report file written as generations finish")
+    parser.add_argument("--report-format", choices=["csv", "parquet", "arrow"], default="csv",
+                        help="parquet and arrow (Feather v2) need pyarrow")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="master seed for every random stream (headless, GUI and worker processes)")
+    parser.add_argument("--selection", choices=["roulette", "tournament", "rank"], default="roulette",
+                        help="parent selection strategy for headless runs")
+    parser.add_argument("--checkpoint", default=None,
+                        help="checkpoint file written during headless runs")
+    parser.add_argument("--checkpoint-every", type=int, default=10,
+                        help="generations between checkpoints")
+    parser.add_argument("--resume", default=None,
+                        help="continue a headless run from a checkpoint file")
+    parser.add_argument("--eval-workers", type=int, default=None,
+                        help="score each generation in isolated worlds on this many processes")
+    parser.add_argument("--eval-batch-size", type=int, default=1,
+                        help="genomes that share one isolated world with --eval-workers")
+    parser.add_argument("--eval-cache-size", type=int, default=4096,
+                        help="results kept in the --eval-workers fitness cache (0 turns it off)")
+    parser.add_argument("--eval-fixed-env", action="store_true",
+                        help="evaluate every generation in the same food layouts with --eval-workers or --environments")
+    parser.add_argument("--end-when", nargs="*", choices=["all_dead", "food_exhausted", "stable_rankings"],
+                        default=["all_dead"],
+                        help="end a generation early when any of these happens (none: always run the full budget)")
+    parser.add_argument("--stable-steps", type=int, default=100,
+                        help="steps the fitness ranking must stay unchanged for stable_rankings")
+    parser.add_argument("--curriculum", type=float, nargs=3, metavar=("START", "MAX", "PER_FITNESS"),
+                        help="grow the steps per generation from START to MAX by PER_FITNESS steps for every "
+                             "point of best fitness reached")
+    parser.add_argument("--environments", type=int, default=None,
+                        help="score each generation in this many food layouts stepped together as one batch")
+    parser.add_argument("--env-fitness", choices=["mean", "min"], default="mean",
+                        help="how --environments combines a dot's results into its fitness")
+    parser.add_argument("--hall-of-fame", default=None,
+                        help="archive file of the best genomes across runs, created if missing")
+    parser.add_argument("--hall-size", type=int, default=100,
+                        help="how many genomes a new --hall-of-fame archive holds")
+    parser.add_argument("--warm-start", type=float, default=0.0,
+                        help="fraction of the first population taken from the --hall-of-fame archive")
+    parser.add_argument("--grid",
+                        help="JSON parameter grid; runs every combination for every seed in a process pool")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0],
+                        help="seeds to run for each combination of the parameter grid")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for --grid (defaults to all cores)")
+    parser.add_argument("--output-dir", default="experiments",
+                        help="directory for per-run results and the merged summary")
+    parser.add_argument("--islands", type=int, default=None,
+                        help="evolve this many populations in separate processes with migration")
+    parser.add_argument("--migration-interval", type=int, default=5,
+                        help="generations between elite exchanges with --islands")
+    parser.add_argument("--topology", choices=["ring", "random"], default="ring",
+                        help="which island each island's elites migrate to")
+    parser.add_argument("--record", default=None,
+                        help="write a replay of every headless step to this file")
+    parser.add_argument("--replay", default=None,
+                        help="open a recorded replay file in the viewer")
+    parser.add_argument("--log-level", default="INFO",
+                        help="level for the evolution.* loggers (DEBUG shows every step)")
+    parser.add_argument("--log-dots", action="store_true",
+                        help="log per-dot events such as collisions and deaths at DEBUG")
+    parser.add_argument("--log-sample", type=float, default=1.0,
+                        help="fraction of per-dot log records to keep")
+    parser.add_argument("--log-rate", type=float, default=None,
+                        help="maximum per-dot log records per second")
+    parser.add_argument("--events", default=None,
+                        help="JSON-lines file for death, collision and generation events")
+    parser.add_argument("--profile", action="store_true",
+                        help="time every phase and print a profile when the run ends")
+    parser.add_argument("--profile-output", default=None,
+                        help="also write the final profile to this JSON file (implies --profile)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve live profiling metrics on localhost (/metrics, /metrics.json)")
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+def run_headless(args):
+    from simulation.checkpoint import Checkpointer, load_checkpoint
+    from simulation.engine import Simulation
+    hall_of_fame = None
+    if args.hall_of_fame:
+        from simulation.hall_of_fame import HallOfFame
+        hall_of_fame = HallOfFame(args.hall_of_fame, args.hall_size)
+    if args.resume:
+        simulation = load_checkpoint(args.resume, output_csv=args.output,
+                                     report_format=args.report_format)
+        simulation.hall_of_fame = hall_of_fame
+    else:
+        simulation = Simulation(args.width, args.height, output_csv=args.output,
+                                report_format=args.report_format, seed=args.seed)
+        simulation.hall_of_fame = hall_of_fame
+        simulation.warm_start = args.warm_start
+        simulation.start(simulation.algorithm.population_size)
+    if args.selection != "roulette":
+        from algorithms.selection import make_selection
+        simulation.algorithm.selection = make_selection(args.selection)
+    from simulation.termination import StepCurriculum, make_termination
+    curriculum = None
+    if args.curriculum:
+        start, maximum, per_fitness = args.curriculum
+        curriculum = StepCurriculum(int(start), int(maximum), per_fitness)
+    simulation.termination = make_termination(args.end_when, args.stable_steps, curriculum=curriculum)
+    if curriculum is not None and not args.resume:
+        simulation.termination.reset(simulation)
+    if args.record:
+        from simulation.replay import ReplayRecorder
+        simulation.recorder = ReplayRecorder(args.record, simulation.width, simulation.height)
+
+    # Evaluation worlds are derived from the master seed, which a resumed run
+    # takes from the checkpoint
+    checkpoint_path = args.checkpoint or args.resume
+    checkpointer = Checkpointer(checkpoint_path, args.checkpoint_every) if checkpoint_path else None
+    if args.environments:
+        from simulation.environments import MultiEnvironmentEvaluator
+        evaluator = MultiEnvironmentEvaluator(args.environments, args.env_fitness, seed=simulation.rng.seed,
+                                              width=simulation.width, height=simulation.height,
+                                              fixed_environment=args.eval_fixed_env)
+    elif args.eval_workers:
+        from simulation.evaluation import ParallelEvaluator
+        evaluator = ParallelEvaluator(args.eval_workers, args.eval_batch_size, seed=simulation.rng.seed,
+                                      width=simulation.width, height=simulation.height,
+                                      cache_size=args.eval_cache_size,
+                                      fixed_environment=args.eval_fixed_env)
+    else:
+        evaluator = None
+    try:
+        simulation.run(args.generations, evaluator=evaluator, checkpointer=checkpointer)
+    finally:
+        if evaluator is not None:
+            evaluator.close()
+    simulation.close()
+    log.info("Finished %d generations.", args.generations)
+
+def start_profiling(args):
+    # Turns the profiler on when asked for and starts the metrics endpoint
+    from simulation.profiling import PROFILER, MetricsServer
+    if not (args.profile or args.profile_output or args.metrics_port is not None):
+        return None
+    PROFILER.enable()
+    if args.metrics_port is not None:
+        return MetricsServer(args.metrics_port).start()
+    return None
+
+def finish_profiling(args, server):
+    import json
+    from simulation.profiling import PROFILER
+    if server is not None:
+        server.stop()
+    if not PROFILER.enabled:
+        return
+    if args.profile or args.profile_output:
+        print(PROFILER.report())
+    if args.profile_output:
+        with open(args.profile_output, 'w') as f:
+            json.dump(PROFILER.snapshot(), f, indent=2)
+        log.info("Wrote profile to %s.", args.profile_output)
+    PROFILER.disable()
+
+def run_grid(args):
+    from simulation.experiments import load_grid, run_experiments
+    run_experiments(load_grid(args.grid), args.seeds, args.generations, args.output_dir,
+                    workers=args.workers, width=args.width, height=args.height)
+
+def run_islands(args):
+    from simulation.islands import IslandModel
+    config = {"selection": args.selection} if args.selection != "roulette" else {}
+    model = IslandModel(args.islands, args.migration_interval, args.topology,
+                        seed=args.seed or 0, config=config, output_dir=args.output_dir,
+                        width=args.width, height=args.height)
+    model.run(args.generations)
+
+def run_gui(argv, replay=None, seed=None):
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(argv)
+    if replay:
+        from gui.replay_viewer import ReplayViewer
+        main_window = ReplayViewer(replay)
+    else:
+        from gui.main_window import MainWindow
+        main_window = MainWindow(seed)
     main_window.show()
-    print("Application started.")
-    sys.exit(app.exec_())
+    log.info("Application started.")
+    return app.exec_()
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    configure_logging(args.log_level, "DEBUG" if args.log_dots else "WARNING",
+                      args.log_sample, args.log_rate, args.events)
+    server = start_profiling(args)
+    status = 0
+    try:
+        if args.grid:
+            run_grid(args)
+        elif args.islands:
+            run_islands(args)
+        elif args.headless:
+            run_headless(args)
+        else:
+            status = run_gui(sys.argv, args.replay, args.seed)
+    finally:
+        finish_profiling(args, server)
+    sys.exit(status)
@@ -0,0 +1,136 @@
+# simulation/checkpoint.py
+import json
+import os
+import numpy as np
+from algorithms.neural_network import SimpleNeuralNetwork
+from simulation.engine import Dot, Food, Simulation
+from simulation.log import get_logger
+
+log = get_logger("checkpoint")
+
+FORMAT_VERSION = 2
+
+def save_checkpoint(simulation, path):
+    # Everything needed to continue the run exactly: counters, the population,
+    # the food in insertion order, logging state and every RNG stream. Stored as
+    # plain arrays in an uncompressed .npz, written atomically.
+    simulation.report.flush()
+    algorithm = simulation.algorithm
+    dots = simulation.dots
+    foods = list(simulation.foods)
+
+    logged_ids = np.array(sorted(simulation.logged_state), dtype=np.int64)
+    logged = [simulation.logged_state[i] for i in logged_ids]
+    lineage_records, spilled = simulation.lineage.state()
+
+    arrays = {
+        "version": np.array(FORMAT_VERSION),
+        "world": np.array([simulation.width, simulation.height, simulation.steps_per_generation,
+                           simulation.current_step, simulation.total_steps, Dot._id_counter], dtype=np.int64),
+        "algorithm": np.array([algorithm.population_size, algorithm.elite_size, algorithm.generation,
+                               algorithm.no_improvement_count], dtype=np.int64),
+        "rates": np.array([algorithm.base_mutation_rate, algorithm.mutation_rate,
+                           algorithm.last_best_fitness], dtype=np.float64),
+        "dot_ids": np.array([d.id for d in dots], dtype=np.int64),
+        "dot_birth": np.array([d.birth_generation for d in dots], dtype=np.int64),
+        "dot_parents": np.array([(tuple(d.parent_ids) + (-1, -1))[:2] for d in dots], dtype=np.int64).reshape(-1, 2),
+        "dot_state": np.array([(d.x, d.y, d.last_x, d.last_y, d.speed, d.food_eaten, d.max_food_eaten)
+                               for d in dots], dtype=np.float64).reshape(-1, 7),
+        "dot_genomes": np.array([d.network.genome for d in dots], dtype=np.float64).reshape(len(dots), -1),
+        "dot_shape": np.array([dots[0].network.input_size, dots[0].network.hidden_size,
+                               dots[0].network.output_size] if dots else [7, 8, 2], dtype=np.int64),
+        "foods": np.array([(f.x, f.y) for f in foods], dtype=np.float64).reshape(-1, 2),
+        "pending_log_ids": np.array(sorted(simulation.pending_log_ids), dtype=np.int64),
+        "generation_started": np.array(sorted(simulation.generation_started.items()), dtype=np.int64).reshape(-1, 2),
+        "logged_ids": logged_ids,
+        "logged_values": np.array([(food, highest, np.nan if died is None else died)
+                                   for food, highest, died, _ in logged], dtype=np.float64).reshape(-1, 3),
+        "logged_alive": np.array([status == "Alive" for _, _, _, status in logged], dtype=bool),
+        "lineage_records": lineage_records,
+        "lineage_spilled": spilled,
+        "report_offset": np.array(simulation.report.tell(), dtype=np.int64),
+        "summary_offset": np.array(simulation.summary.tell(), dtype=np.int64),
+        # Generator states hold 128-bit integers, so they travel as JSON text
+        "rng_state": np.array(json.dumps(simulation.rng.state())),
+        "seed": np.array(str(simulation.rng.seed)),
+        "run_id": np.array(simulation.run_id, dtype=np.int64),
+    }
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+    log.info("Saved checkpoint for generation %d to %s.", algorithm.generation, path)
+
+def load_checkpoint(path, output_csv="simulation_report.csv", report_format="csv", lineage=True):
+    with np.load(path) as data:
+        arrays = {name: data[name] for name in data.files}
+    if int(arrays["version"]) != FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version {int(arrays['version'])} in {path}")
+
+    width, height, steps_per_generation, current_step, total_steps, id_counter = arrays["world"].tolist()
+    simulation = Simulation(width, height, steps_per_generation=steps_per_generation,
+                            output_csv=output_csv, report_format=report_format, lineage=lineage)
+    simulation.current_step = current_step
+    simulation.total_steps = total_steps
+
+    algorithm = simulation.algorithm
+    algorithm.population_size, algorithm.elite_size, algorithm.generation, algorithm.no_improvement_count = \
+        arrays["algorithm"].tolist()
+    algorithm.base_mutation_rate, algorithm.mutation_rate, algorithm.last_best_fitness = arrays["rates"].tolist()
+
+    input_size, hidden_size, output_size = arrays["dot_shape"].tolist()
+    for dot_id, birth, parents, state, genome in zip(
+            arrays["dot_ids"].tolist(), arrays["dot_birth"].tolist(), arrays["dot_parents"].tolist(),
+            arrays["dot_state"].tolist(), arrays["dot_genomes"]):
+        x, y, last_x, last_y, speed, food_eaten, max_food_eaten = state
+        network = SimpleNeuralNetwork(input_size, hidden_size, output_size, genome=genome.copy())
+        dot = Dot(x, y, speed, network=network, birth_generation=birth)
+        dot.id = dot_id
+        dot.last_x, dot.last_y = last_x, last_y
+        dot.food_eaten = food_eaten
+        dot.max_food_eaten = max_food_eaten
+        dot.parent_ids = tuple(p for p in parents if p >= 0)
+        simulation.dots.append(dot)
+    Dot._id_counter = id_counter
+
+    for x, y in arrays["foods"].tolist():
+        simulation.foods.append(Food(x, y))
+
+    simulation.pending_log_ids = set(arrays["pending_log_ids"].tolist())
+    if "generation_started" in arrays:
+        simulation.generation_started = dict(arrays["generation_started"].tolist())
+    else:
+        # Older checkpoints only know the budget, so assume every earlier
+        # generation ran all of it
+        simulation.generation_started = {
+            g: max(0, total_steps - current_step - (algorithm.generation - g) * steps_per_generation)
+            for g in range(1, algorithm.generation + 1)}
+    for dot_id, (food, highest, died), alive in zip(
+            arrays["logged_ids"].tolist(), arrays["logged_values"].tolist(), arrays["logged_alive"].tolist()):
+        died = None if np.isnan(died) else died
+        simulation.logged_state[dot_id] = (food, highest, died, "Alive" if alive else "Dead")
+
+    simulation.lineage.restore(arrays["lineage_records"], arrays["lineage_spilled"])
+    simulation.report.truncate(int(arrays["report_offset"]))
+    # Checkpoints from before the summary offset was stored keep the whole file
+    simulation.summary.truncate(int(arrays["summary_offset"]) if "summary_offset" in arrays else None)
+
+    simulation.rng.restore(json.loads(str(arrays["rng_state"])))
+    if "seed" in arrays:
+        simulation.rng.seed = int(str(arrays["seed"]))
+    if "run_id" in arrays:
+        simulation.run_id = int(arrays["run_id"])
+
+    log.info("Resumed generation %d step %d from %s.", algorithm.generation, current_step, path)
+    return simulation
+
+class Checkpointer:
+    # Passed to Simulation.run; saves after every `every`-th finished generation
+    def __init__(self, path, every=1):
+        self.path = path
+        self.every = max(1, every)
+
+    def __call__(self, simulation):
+        if (simulation.algorithm.generation - 1) % self.every == 0:
+            save_checkpoint(simulation, self.path)
@@ -0,0 +1,637 @@
+# simulation/engine.py
+import logging
+import math
+import numpy as np
+from algorithms.evolution import EvolutionAlgorithm
+from algorithms.neural_network import SimpleNeuralNetwork
+from simulation.hall_of_fame import run_id
+from simulation.lineage import LineageStore, lineage_path
+from simulation.profiling import PROFILER
+from simulation.report import ReportWriter
+from simulation.rng import RandomStreams
+from simulation.spatial import FoodGrid
+from simulation.summary import METRICS, SummaryWriter, summary_path
+from simulation.termination import AllDead, Termination
+from simulation import log as logs
+from simulation.world import (World, X, Y, LAST_X, LAST_Y, SPEED, FOOD, MAX_FOOD, first_per_target,
+                              nearest_food, sense)
+
+log = logs.get_logger("engine")
+dot_log = logging.getLogger(logs.DOTS)
+
+def _state_field(index):
+    # A Dot field stored in its World column while it has one, and in the
+    # dot's own list otherwise
+    def get(self):
+        if self.world is None:
+            return self._state[index]
+        return self.world.state[index, self.column].item()
+
+    def set(self, value):
+        if self.world is None:
+            self._state[index] = value
+        else:
+            self.world.state[index, self.column] = value
+    return property(get, set)
+
+class Dot:
+    __slots__ = ("world", "column", "_state", "network", "birth_generation", "parent_ids", "id")
+    _id_counter = 0
+
+    x = _state_field(X)
+    y = _state_field(Y)
+    last_x = _state_field(LAST_X)
+    last_y = _state_field(LAST_Y)
+    speed = _state_field(SPEED)
+    food_eaten = _state_field(FOOD)
+    max_food_eaten = _state_field(MAX_FOOD)
+
+    def __init__(self, x, y, speed=1, network=None, birth_generation=0):
+        self.world = None
+        self.column = None
+        self._state = [x, y, x, y, speed, 5, 5.0]
+        self.network = network if network is not None else SimpleNeuralNetwork()
+        self.birth_generation = birth_generation
+        self.parent_ids = ()
+        self.id = Dot._id_counter
+        Dot._id_counter += 1
+
+    @classmethod
+    def spawn(cls, xs, ys, speeds, networks, parent_ids=None, birth_generation=0):
+        # Many unbound dots at once, the same as calling Dot() for each but
+        # without the per-call overhead; xs, ys and speeds are plain lists
+        first = cls._id_counter
+        cls._id_counter += len(networks)
+        parent_ids = parent_ids if parent_ids is not None else [()] * len(networks)
+        new = object.__new__
+        dots = []
+        for dot_id, x, y, speed, network, parents in zip(range(first, cls._id_counter), xs, ys, speeds,
+                                                         networks, parent_ids):
+            dot = new(cls)
+            dot.world = dot.column = None
+            dot._state = [x, y, x, y, speed, 5, 5.0]
+            dot.network = network
+            dot.birth_generation = birth_generation
+            dot.parent_ids = parents
+            dot.id = dot_id
+            dots.append(dot)
+        return dots
+
+    def state_values(self):
+        # Every field, in world.FIELDS order
+        if self.world is None:
+            return list(self._state)
+        return self.world.state[:, self.column].tolist()
+
+    def bind(self, owner, column):
+        self.world = owner
+        self.column = column
+        self._state = None
+
+    def unbind(self, values):
+        self.world = None
+        self.column = None
+        self._state = list(values)
+
+    def set_food_eaten(self, new_value):
+        self.food_eaten = new_value
+        if self.food_eaten > self.max_food_eaten:
+            self.max_food_eaten = self.food_eaten
+
+    def sense(self, nearest_food, board_width, board_height, foods):
+        nx = self.x / board_width
+        ny = self.y / board_height
+
+        if nearest_food is not None:
+            nfx = nearest_food.x / board_width
+            nfy = nearest_food.y / board_height
+        else:
+            nfx = 0.5
+            nfy = 0.5
+
+        f_level = min(self.food_eaten / 10.0, 1.0)
+
+        radius = 50.0
+        nearby_food_count = foods.count_within(self.x, self.y, radius)
+        food_density = min(nearby_food_count / 10.0, 1.0)
+
+        dist_left = self.x
+        dist_right = board_width - self.x
+        dist_top = self.y
+        dist_bottom = board_height - self.y
+        min_dist_edge = min(dist_left, dist_right, dist_top, dist_bottom)
+        half_min_dim = min(board_width, board_height) / 2.0
+        boundary_dist = min_dist_edge / half_min_dim
+        if boundary_dist > 1.0:
+            boundary_dist = 1.0
+
+        return [nx, ny, nfx, nfy, f_level, food_density, boundary_dist]
+
+    def decide_move(self, nearest_food, board_width, board_height, foods):
+        inputs = self.sense(nearest_food, board_width, board_height, foods)
+        dx, dy = self.network.forward(inputs)
+        return dx * self.speed, dy * self.speed
+
+    def check_collision(self, food):
+        distance = math.sqrt((self.x - food.x)**2 + (self.y - food.y)**2)
+        return distance < 10
+
+class Food:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+class Simulation:
+    # Pure-Python simulation engine. It owns the world state and the generation
+    # loop; the Qt Board only drives it and renders snapshots of it.
+    def __init__(self, width=600, height=400, algorithm=None, steps_per_generation=1000,
+                 output_csv="simulation_report.csv", report_format="csv", lineage=True, seed=None,
+                 summary=True):
+        self.width = width
+        self.height = height
+        self.dots = []
+        self.foods = FoodGrid()
+        self.algorithm = algorithm if algorithm is not None else EvolutionAlgorithm()
+
+        # Every random draw comes from these streams, all derived from `seed`
+        self.rng = RandomStreams(seed)
+        self.algorithm.rng = self.rng.selection
+        self.algorithm.genome_rng = self.rng.genome
+
+        self.steps_per_generation = steps_per_generation
+        self.current_step = 0
+        self.total_steps = 0
+        # total_steps when each generation started; a dot's lifetime_steps
+        # are the steps actually run since its birth generation began
+        self.generation_started = {self.algorithm.generation: 0}
+
+        # Decides when a generation ends; by default as soon as every dot is
+        # dead, and otherwise after steps_per_generation steps
+        self.termination = Termination([AllDead()])
+
+        # Food spawning and depletion schedules, in steps (None disables them)
+        self.food_interval = None
+        self.depletion_interval = None
+
+        # Per-generation counters, reset when a generation ends
+        self.collisions = 0
+        self.deaths = 0
+
+        # Logging data
+        self.experiment_data = []
+        self.output_csv = output_csv
+        self.report = ReportWriter(output_csv, report_format)
+        # Dots whose rows may still change, and the last state written for each
+        self.pending_log_ids = set()
+        self.logged_state = {}
+
+        # Summaries of every dot created; old generations spill to disk
+        self.lineage = LineageStore(lineage_path(output_csv) if lineage else None)
+
+        # Running aggregates of every generation, next to the report
+        self.summary = SummaryWriter(summary_path(output_csv) if summary else None)
+
+        # Called with (generation, best_fitness) after every generation
+        self.generation_listeners = []
+
+        # Optional ReplayRecorder, fed one frame per tick
+        self.recorder = None
+
+        # Optional HallOfFame: the best dots of every generation are offered
+        # to it, and `warm_start` of every new random population (a fraction)
+        # starts from its top genomes
+        self.hall_of_fame = None
+        self.warm_start = 0.0
+        self.run_id = run_id(self.rng.seed)
+
+        # Array state of the current population (see the world property) and
+        # the food coordinates, both rebuilt when they change
+        self._world = None
+        self._food_key = None
+        self._food_cache = None
+
+    def resize(self, width, height):
+        self.width = width
+        self.height = height
+
+    def start(self, num_dots, num_food=20):
+        self.termination.reset(self)
+        self.add_dots(num_dots)
+        self.add_food(num_food)
+
+    def run(self, generations, food_interval=50, depletion_interval=200, evaluator=None,
+            checkpointer=None):
+        # Intervals are in steps; 50 and 200 match the GUI's 5 s food and
+        # 20 s depletion timers at one step per 100 ms. The checkpointer is
+        # called with the simulation once each generation's last tick is done.
+        self.food_interval = food_interval
+        self.depletion_interval = depletion_interval
+        target = self.algorithm.generation + generations
+        while self.algorithm.generation < target:
+            generation = self.algorithm.generation
+            if evaluator is not None:
+                self.evaluate_generation(evaluator)
+            else:
+                self.tick()
+            if checkpointer is not None and self.algorithm.generation != generation:
+                checkpointer(self)
+
+    def tick(self):
+        # One step plus whatever food spawning or depletion falls due on it
+        lap = PROFILER.lap()
+        self.step()
+        if self.food_interval and self.total_steps % self.food_interval == 0:
+            self.add_food_periodically()
+        if self.depletion_interval and self.total_steps % self.depletion_interval == 0:
+            self.deplete_food()
+        if self.recorder is not None:
+            self.recorder.record(self)
+        if lap is not None:
+            lap("step")
+            PROFILER.count("steps")
+            PROFILER.gauge("foods", len(self.foods))
+            PROFILER.gauge("dots", len(self.dots))
+
+    def add_dots(self, num_dots):
+        Dot._id_counter = 0
+        self.dots = self._spawn_dots(num_dots, self.algorithm.generation)
+        seeded = self._warm_start_count(num_dots)
+        self.pending_log_ids = set(d.id for d in self.dots)
+        log.info("Added %d initial dots.", len(self.dots))
+
+        # Add a large cluster of food in the center to encourage movement inward
+        self.add_food_cluster()
+        log.debug("Added 50 food items in the center.")
+
+        # Add a slight bias to output layer biases to encourage movement;
+        # genomes from the hall of fame already move
+        for d in self.dots[seeded:]:
+            d.network.b2 += 0.2
+        log.debug("Added bias to neural networks to encourage movement.")
+
+    def add_food_cluster(self, count=50, spread=50):
+        center_x = self.width // 2
+        center_y = self.height // 2
+        world = self.rng.world
+        xs = world.integers(center_x - spread, center_x + spread + 1, count).tolist()
+        ys = world.integers(center_y - spread, center_y + spread + 1, count).tolist()
+        for fx, fy in zip(xs, ys):
+            self.foods.append(Food(fx, fy))
+
+    def add_food(self, num_food):
+        world = self.rng.world
+        xs = world.integers(0, self.width, num_food).tolist()
+        ys = world.integers(0, self.height, num_food).tolist()
+        for x, y in zip(xs, ys):
+            self.foods.append(Food(x, y))
+        log.debug("Added %d new food items.", num_food)
+
+    def add_food_periodically(self):
+        num_food = int(self.rng.world.integers(2, 6))
+        self.add_food(num_food)
+
+    def deplete_food(self):
+        state = self.world.state
+        hungry = self.world.alive & (state[FOOD] > 0)
+        state[FOOD, hungry] -= 1
+        np.maximum(state[MAX_FOOD], state[FOOD], out=state[MAX_FOOD], where=hungry)
+        log.debug("Depleted food for all dots by 1.")
+
+    def step(self):
+        self.current_step += 1
+        self.total_steps += 1
+        log.debug("Step %d/%d", self.current_step, self.steps_per_generation)
+
+        self.move_dots()
+
+        reason = self.termination.check(self)
+        if reason is not None:
+            log.debug("Ending generation: %s.", reason)
+            self.end_generation(reason)
+
+    @property
+    def world(self):
+        # Array state behind self.dots. Replacing or growing the population
+        # list from outside is picked up here and the arrays are rebuilt.
+        current = self._world
+        if current is None or current.population is not self.dots or len(current.population) != len(self.dots):
+            self._world = World(self.dots)
+            if current is not None:
+                current.release()
+        return self._world
+
+    def food_arrays(self):
+        # Food objects in insertion order with their coordinates, rebuilt only
+        # when the food grid has changed
+        grid = self.foods
+        key = (grid, grid.changes)
+        if self._food_key != key:
+            foods = list(grid)
+            self._food_cache = (foods,
+                                np.fromiter((f.x for f in foods), dtype=np.float64, count=len(foods)),
+                                np.fromiter((f.y for f in foods), dtype=np.float64, count=len(foods)))
+            self._food_key = key
+        return self._food_cache
+
+    def move_dots(self):
+        # One environment step over the world arrays. Dots act in population
+        # order as far as anyone can observe: every dot senses the world as it
+        # was before the step, and when several reach the same food only the
+        # first of them eats it.
+        lap = PROFILER.lap()
+        state = self.world.state
+        x, y, speed = state[X], state[Y], state[SPEED]
+        food, highest = state[FOOD], state[MAX_FOOD]
+        width, height = self.width, self.height
+
+        active = np.flatnonzero(self.world.alive & (food > 0))
+        foods, food_x, food_y = self.food_arrays()
+        ax, ay = x[active], y[active]
+        if foods:
+            targets, nearby = nearest_food(ax, ay, food_x, food_y)
+            tx, ty = food_x[targets], food_y[targets]
+            inputs = sense(ax, ay, food[active], tx, ty, nearby, width, height)
+        else:
+            inputs = sense(ax, ay, food[active], None, None, np.zeros(len(active)), width, height)
+        if lap is not None:
+            lap("sense")
+        # Gathering the weights of a subset costs a copy, so skip it while nobody has died
+        moves = self.world.batch.forward(inputs, active if len(active) < len(self.world) else None)
+        if lap is not None:
+            lap("forward")
+
+        new_x = np.maximum(0, np.minimum(width - 10, ax + moves[:, 0] * speed[active]))
+        new_y = np.maximum(0, np.minimum(height - 10, ay + moves[:, 1] * speed[active]))
+        state[LAST_X, active], state[LAST_Y, active] = ax, ay
+        x[active], y[active] = new_x, new_y
+
+        # Each reward is applied after the previous one and max_food_eaten
+        # follows every intermediate value, as set_food_eaten did per dot
+        level = food[active]
+        best = highest[active]
+        stages = []
+
+        def reward(name, condition, amount):
+            nonlocal level, best
+            level = np.where(condition, level + amount, level)
+            best = np.where(condition & (level > best), level, best)
+            stages.append((name, condition, level))
+
+        eaten = np.zeros(len(active), dtype=bool)
+        if foods:
+            old_dist = np.sqrt((ax - tx)**2 + (ay - ty)**2)
+            new_dist = np.sqrt((new_x - tx)**2 + (new_y - ty)**2)
+            winners = first_per_target(np.flatnonzero(new_dist < 10), targets)
+            eaten[winners] = True
+            reward("collision", eaten, 3)
+            reward("closer", new_dist < old_dist, 0.1)
+            reward("far", new_dist > 100, -0.01)
+        moved = np.sqrt((new_x - ax)**2 + (new_y - ay)**2) > 5
+        reward("moved", moved, 0.1)
+        min_dist_edge = np.minimum(np.minimum(new_x, width - new_x), np.minimum(new_y, height - new_y))
+        reward("edge", min_dist_edge < 50, -0.1)
+        food[active] = level
+        highest[active] = best
+
+        eaten_foods = [foods[i] for i in targets[eaten].tolist()] if eaten.any() else []
+        for item in eaten_foods:
+            self.foods.remove(item)
+        self.collisions += len(eaten_foods)
+        self._log_step(active, stages, eaten, eaten_foods)
+        if lap is not None:
+            lap("rewards")
+            PROFILER.count("collisions", len(eaten_foods))
+
+        # Separate alive and dead dots
+        gone = np.flatnonzero(self.world.alive & ~(food > 0))
+        if len(gone):
+            dead = gone[food[gone] <= 0]
+            self._record_deaths([self.world.dots[i] for i in dead.tolist()])
+            self.dots = self.world.bury(gone)
+        if lap is not None:
+            lap("deaths")
+            PROFILER.count("deaths", len(gone))
+
+    def _log_step(self, active, stages, eaten, eaten_foods):
+        # Per-dot debug lines and collision events, in the order the
+        # one-dot-at-a-time loop used to produce them
+        dot_debug = dot_log.isEnabledFor(logging.DEBUG)
+        events = logs.events_enabled() and eaten_foods
+        if not (dot_debug or events):
+            return
+        messages = {"collision": "Dot %d collided with food. Food eaten: %s",
+                    "moved": "Dot %d moved significantly. Food eaten: %s",
+                    "edge": "Dot %d is near an edge. Food eaten: %s"}
+        foods = dict(zip(np.flatnonzero(eaten).tolist(), eaten_foods))
+        for i in range(len(active)) if dot_debug else foods:
+            dot = self.world.dots[active[i]]
+            for name, condition, level in stages:
+                if not condition[i]:
+                    continue
+                if name == "collision" and events:
+                    item = foods[i]
+                    logs.event("collision", generation=self.algorithm.generation, step=self.current_step,
+                               dot=dot.id, x=round(item.x, 2), y=round(item.y, 2),
+                               food_eaten=round(float(level[i]), 2))
+                if dot_debug and name in messages:
+                    dot_log.debug(messages[name], dot.id, float(level[i]))
+
+    def _record_deaths(self, dead_dots):
+        # Mark food_when_died for newly dead
+        dot_debug = dot_log.isEnabledFor(logging.DEBUG)
+        events = logs.events_enabled()
+        for d in dead_dots:
+            if self.lineage.record_death(d):
+                self.deaths += 1
+                if dot_debug:
+                    dot_log.debug("Dot %d has died. Food when died: %s", d.id, d.food_eaten)
+                if events:
+                    logs.event("death", generation=self.algorithm.generation, step=self.current_step,
+                               dot=d.id, food_when_died=round(d.food_eaten, 2),
+                               highest_food=round(d.max_food_eaten, 2))
+
+    def evaluate_generation(self, evaluator):
+        # Score the whole generation in isolated world copies instead of stepping
+        # the shared world, then breed from those scores as usual.
+        results = evaluator.evaluate(self.dots, self.steps_per_generation, self.algorithm.generation)
+        for dot, (food_eaten, highest) in zip(self.dots, results):
+            dot.food_eaten = float(food_eaten)
+            dot.max_food_eaten = float(highest)
+
+        for d in self.dots:
+            if d.food_eaten <= 0 and self.lineage.record_death(d):
+                self.deaths += 1
+        self.dots = [d for d in self.dots if d.food_eaten > 0]
+
+        self.current_step = self.steps_per_generation
+        self.total_steps += self.steps_per_generation
+        log.info("Evaluated %d dots of generation %d in isolated worlds.", len(results), self.algorithm.generation)
+        self.end_generation()
+
+    def _spawn_dots(self, num_dots, birth_gen):
+        world = self.rng.world
+        xs = world.integers(0, self.width, num_dots).tolist()
+        ys = world.integers(0, self.height, num_dots).tolist()
+        speeds = world.uniform(1, 3, num_dots).tolist()
+        population = []
+        for x, y, speed in zip(xs, ys, speeds):
+            dot = Dot(x, y, speed, network=SimpleNeuralNetwork(rng=self.rng.genome), birth_generation=birth_gen)
+            population.append(dot)
+        # Every draw above is made either way, so the random streams do not
+        # depend on what the archive holds
+        seeded = self._warm_start_count(num_dots)
+        if seeded:
+            shape = self.hall_of_fame.network_shape
+            for dot, entry in zip(population, self.hall_of_fame.top(seeded)):
+                dot.network = SimpleNeuralNetwork(*shape, genome=entry["genome"].copy())
+                dot.speed = float(entry["speed"])
+            log.info("Seeded %d of %d dots from the hall of fame.", seeded, num_dots)
+        for dot in population:
+            self.lineage.add(dot)
+        return population
+
+    def _warm_start_count(self, num_dots):
+        if self.hall_of_fame is None or not self.warm_start:
+            return 0
+        return min(len(self.hall_of_fame), int(round(self.warm_start * num_dots)))
+
+    def create_random_population(self, num_dots, birth_gen):
+        population = self._spawn_dots(num_dots, birth_gen)
+        log.info("Created a random population of %d dots.", len(population))
+        return population
+
+    def end_generation(self, reason="budget"):
+        lap = PROFILER.lap()
+        best_dots = self.algorithm.evaluate_fitness(self.dots)
+        best_fitness = best_dots[0].food_eaten if best_dots else 0
+        if self.hall_of_fame is not None:
+            self.hall_of_fame.add_dots(best_dots[:self.algorithm.elite_size], self.algorithm.generation, self.run_id)
+        steps = self.current_step
+        budget = self.steps_per_generation
+        foods_left = len(self.foods)
+        log.debug("Best fitness of generation %d: %s", self.algorithm.generation, best_fitness)
+
+        # Increment generation first
+        self.algorithm.generation += 1
+        log.debug("Incremented to generation %d", self.algorithm.generation)
+
+        # Log data
+        self.log_generation_data(best_fitness, steps=steps, budget=budget, reason=reason)
+        survivors = len(self.dots)
+
+        # Produce the next generation
+        new_dots = self.algorithm.next_generation(self.dots)
+        if len(new_dots) == 0:
+            log.info("No new generation produced. Creating random population.")
+            new_dots = self.create_random_population(self.algorithm.population_size, self.algorithm.generation)
+
+        # Assign birth_generation to new offspring
+        for d in new_dots:
+            d.birth_generation = self.algorithm.generation
+            if d.id not in self.lineage:
+                self.lineage.add(d)
+                log.debug("Added new dot %d to the lineage store.", d.id)
+
+        self.dots = new_dots
+        self.pending_log_ids.update(d.id for d in new_dots)
+        self.current_step = 0
+        self.generation_started[self.algorithm.generation] = self.total_steps
+        self.termination.reset(self)
+
+        # Clear existing food and add a new cluster
+        self.clear_food()
+        self.add_food_cluster()
+        log.debug("Added 50 new food items in the center for generation %d.", self.algorithm.generation)
+
+        ended = self.algorithm.generation - 1
+        log.info("Generation %d ended (%s after %d/%d steps). Best fitness: %.2f, survivors: %d, "
+                 "collisions: %d, deaths: %d", ended, reason, steps, budget, best_fitness, survivors,
+                 self.collisions, self.deaths)
+        if logs.events_enabled():
+            logs.event("generation", generation=ended, best_fitness=round(best_fitness, 2),
+                       survivors=survivors, collisions=self.collisions, deaths=self.deaths,
+                       steps=steps, budget=budget, reason=reason, foods=foods_left,
+                       mutation_rate=round(self.algorithm.mutation_rate, 4))
+        self.collisions = 0
+        self.deaths = 0
+
+        for listener in self.generation_listeners:
+            listener(self.algorithm.generation, best_fitness)
+        if lap is not None:
+            lap("generation")
+            PROFILER.count("generations")
+
+    def log_generation_data(self, best_fitness, **fields):
+        # Only dots that took part in this generation can have changed. A row
+        # is written when a dot's state differs from its last written row, and
+        # a dead dot is dropped once its final row has been written. Every dot
+        # that took part also goes into the generation's summary record.
+        log.debug("Logging generation data.")
+        alive_ids = set()
+        for dot in self.dots:
+            self.lineage.update(dot)
+            alive_ids.add(dot.id)
+        took_part = sorted(self.pending_log_ids)
+        alive = np.zeros(len(took_part), dtype=bool)
+        metrics = {name: np.empty(len(took_part)) for name in METRICS}
+        for i, dot_id in enumerate(took_part):
+            rec = self.lineage[dot_id]
+            lifetime = self.total_steps - self.generation_started.get(rec.birth_generation, 0)
+            status = "Alive" if dot_id in alive_ids else "Dead"
+            food_when_died = rec.food_when_died if status == "Dead" else None
+
+            row = {
+                "generation": self.algorithm.generation,
+                "dot_id": dot_id,
+                "food_eaten": round(rec.food_eaten, 2),
+                "highest_food": round(rec.max_food_eaten, 2),
+                "food_when_died": food_when_died,
+                "lifetime_steps": lifetime,
+                "status": status,
+                "generation_created": rec.birth_generation
+            }
+            alive[i] = status == "Alive"
+            metrics["food_eaten"][i] = rec.food_eaten
+            metrics["highest_food"][i] = rec.max_food_eaten
+            metrics["lifetime_steps"][i] = lifetime
+
+            state = (row["food_eaten"], row["highest_food"], food_when_died, status)
+            if self.logged_state.get(dot_id) != state:
+                self.experiment_data.append(row)
+                self.logged_state[dot_id] = state
+            if status == "Dead":
+                self.logged_state.pop(dot_id, None)
+
+        self.pending_log_ids = alive_ids
+        self.write_to_csv()
+        self.summary.record(self.algorithm.generation, alive, metrics, best_fitness=best_fitness, **fields)
+
+        # Dots born before the generation that just ended can no longer change
+        self.lineage.spill_before(self.algorithm.generation - 1)
+
+    def write_to_csv(self):
+        # Hands the generation's rows to the buffered report writer
+        lap = PROFILER.lap()
+        self.report.write_rows(self.experiment_data)
+        self.experiment_data = []
+        if lap is not None:
+            lap("report")
+
+    def close(self):
+        self.report.close()
+        self.lineage.close()
+        self.summary.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.hall_of_fame is not None:
+            self.hall_of_fame.close()
+
+    def clear_food(self):
+        self.foods.clear()
+        log.debug("Cleared all food from the board.")
+
+    def snapshot(self):
+        # Plain coordinates of everything that should be drawn
+        dots = [(dot.x, dot.y) for dot in self.dots if dot.food_eaten > 0]
+        foods = [(food.x, food.y) for food in self.foods]
+        return dots, foods
@@ -0,0 +1,197 @@
+# simulation/environments.py
+import numpy as np
+from algorithms.neural_network import NetworkBatch
+from simulation.evaluation import START_FOOD
+from simulation.experiments import derive_seed
+from simulation.log import get_logger
+from simulation.world import PAIR_BLOCK, first_per_target, sense
+
+log = get_logger("environments")
+
+# How one dot's results from every environment become its fitness
+AGGREGATES = {"mean": np.mean, "min": np.min}
+
+def nearest_present(x, y, food_x, food_y, present):
+    # nearest_food for E worlds at once: x, y are (E,N), food (E,C) with
+    # `present` marking the slots that still hold food
+    e, n = x.shape
+    c = food_x.shape[1]
+    nearest = np.zeros((e, n), dtype=np.intp)
+    nearby = np.zeros((e, n), dtype=np.intp)
+    if not c:
+        return nearest, nearby
+    # Empty slots sit infinitely far away
+    food_x = np.where(present, food_x, np.inf)[:, None, :]
+    food_y = np.where(present, food_y, np.inf)[:, None, :]
+    block = max(1, PAIR_BLOCK // max(e * c, 1))
+    for start in range(0, n, block):
+        end = start + block
+        d2 = np.subtract(food_x, x[:, start:end, None])
+        np.square(d2, out=d2)
+        dy = np.subtract(food_y, y[:, start:end, None])
+        d2 += np.square(dy, out=dy)
+        nearest[:, start:end] = np.argmin(d2, axis=2)
+        nearby[:, start:end] = np.count_nonzero(d2 < 2500.0, axis=2)
+    return nearest, nearby
+
+class EnvironmentBatch:
+    # E independent worlds holding the same population, stacked along the
+    # first axis: dot state is (E,N) and food is (E,C) slots in the order the
+    # food was added. Each world has its own food and starting positions from
+    # its seed and follows the Simulation rules; one forward pass per step
+    # runs every network on its dot's inputs from all worlds.
+    def __init__(self, genomes, speeds, food, seeds, width=600, height=400, num_food=20,
+                 food_interval=50, depletion_interval=200, network_shape=(7, 8, 2)):
+        self.width = width
+        self.height = height
+        self.food_interval = food_interval
+        self.depletion_interval = depletion_interval
+        self.batch = NetworkBatch(genomes, *network_shape)
+        self.speed = np.asarray(speeds, dtype=np.float64)
+        self.rngs = [np.random.default_rng(seed) for seed in seeds]
+
+        e, n = len(self.rngs), len(self.speed)
+        food = np.asarray(food, dtype=np.float64).reshape(n, 2)
+        self.food = np.repeat(food[None, :, 0], e, axis=0)
+        self.highest = np.repeat(food[None, :, 1], e, axis=0)
+        self.alive = self.food > 0
+        self.x = np.empty((e, n))
+        self.y = np.empty((e, n))
+
+        # Slots are never reused, so slot order is the order food was added
+        self.food_x = np.zeros((e, 50 + num_food))
+        self.food_y = np.zeros((e, 50 + num_food))
+        self.present = np.zeros((e, 50 + num_food), dtype=bool)
+        self.added = np.zeros(e, dtype=np.intp)
+        self.steps = 0
+        for env, rng in enumerate(self.rngs):
+            # Same layout rules as Simulation.add_food_cluster and add_food
+            cx, cy = width // 2, height // 2
+            self._add_food(env, rng.integers(cx - 50, cx + 51, 50), rng.integers(cy - 50, cy + 51, 50))
+            self._add_food(env, rng.integers(0, width, num_food), rng.integers(0, height, num_food))
+            self.x[env] = rng.integers(0, width, n)
+            self.y[env] = rng.integers(0, height, n)
+
+    def __len__(self):
+        return len(self.rngs)
+
+    def _add_food(self, env, xs, ys):
+        start = self.added[env]
+        end = start + len(xs)
+        if end > self.food_x.shape[1]:
+            grow = max(end, 2 * self.food_x.shape[1]) - self.food_x.shape[1]
+            self.food_x = np.pad(self.food_x, ((0, 0), (0, grow)))
+            self.food_y = np.pad(self.food_y, ((0, 0), (0, grow)))
+            self.present = np.pad(self.present, ((0, 0), (0, grow)))
+        self.food_x[env, start:end] = xs
+        self.food_y[env, start:end] = ys
+        self.present[env, start:end] = True
+        self.added[env] = end
+
+    def step(self):
+        # Simulation.move_dots for every world, followed by the food spawning
+        # and depletion that fall due
+        width, height = self.width, self.height
+        x, y, food = self.x, self.y, self.food
+        active = self.alive & (food > 0)
+        has_food = self.present.any(axis=1)[:, None]
+
+        targets, nearby = nearest_present(x, y, self.food_x, self.food_y, self.present)
+        tx = np.where(has_food, np.take_along_axis(self.food_x, targets, axis=1), width * 0.5)
+        ty = np.where(has_food, np.take_along_axis(self.food_y, targets, axis=1), height * 0.5)
+        moves = self.batch.forward(sense(x, y, food, tx, ty, nearby, width, height))
+
+        new_x = np.where(active, np.maximum(0, np.minimum(width - 10, x + moves[..., 0] * self.speed)), x)
+        new_y = np.where(active, np.maximum(0, np.minimum(height - 10, y + moves[..., 1] * self.speed)), y)
+
+        level = food
+        best = self.highest
+
+        def reward(condition, amount):
+            nonlocal level, best
+            condition = condition & active
+            level = np.where(condition, level + amount, level)
+            best = np.where(condition & (level > best), level, best)
+
+        old_dist = np.sqrt((x - tx)**2 + (y - ty)**2)
+        new_dist = np.sqrt((new_x - tx)**2 + (new_y - ty)**2)
+        # Per world, the first dot to reach a food eats it
+        keys = (np.arange(len(self))[:, None] * self.food_x.shape[1] + targets).ravel()
+        candidates = np.flatnonzero((active & has_food & (new_dist < 10)).ravel())
+        eaten = np.zeros(x.size, dtype=bool)
+        eaten[first_per_target(candidates, keys)] = True
+        eaten = eaten.reshape(x.shape)
+        self.present[np.nonzero(eaten)[0], targets[eaten]] = False
+        reward(eaten, 3)
+        reward(has_food & (new_dist < old_dist), 0.1)
+        reward(has_food & (new_dist > 100), -0.01)
+        reward(np.sqrt((new_x - x)**2 + (new_y - y)**2) > 5, 0.1)
+        min_dist_edge = np.minimum(np.minimum(new_x, width - new_x), np.minimum(new_y, height - new_y))
+        reward(min_dist_edge < 50, -0.1)
+
+        self.x, self.y, self.food, self.highest = new_x, new_y, level, best
+        self.alive &= self.food > 0
+
+        self.steps += 1
+        if self.food_interval and self.steps % self.food_interval == 0:
+            for env, rng in enumerate(self.rngs):
+                count = int(rng.integers(2, 6))
+                self._add_food(env, rng.integers(0, width, count), rng.integers(0, height, count))
+        if self.depletion_interval and self.steps % self.depletion_interval == 0:
+            hungry = self.alive & (self.food > 0)
+            self.food = np.where(hungry, self.food - 1, self.food)
+            self.highest = np.where(hungry, np.maximum(self.highest, self.food), self.highest)
+
+    def run(self, steps):
+        for _ in range(steps):
+            if not self.alive.any():
+                break
+            self.step()
+        return self.results()
+
+    def results(self):
+        # (E,N,2): food_eaten and max_food_eaten of every dot in every world
+        return np.stack((self.food, self.highest), axis=-1)
+
+class MultiEnvironmentEvaluator:
+    # Scores every dot of a generation in `environments` independent worlds
+    # stepped together as one EnvironmentBatch, and reports the mean or min
+    # of its results across them, so one lucky food layout counts for less.
+    # Every dot starts from START_FOOD, as in ParallelEvaluator. Plugs into Simulation.run(evaluator=...) like ParallelEvaluator.
+    def __init__(self, environments=4, aggregate="mean", seed=0, width=600, height=400,
+                 num_food=20, food_interval=50, depletion_interval=200, fixed_environment=False):
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate {aggregate!r}; choose from {', '.join(AGGREGATES)}")
+        self.environments = environments
+        self.aggregate = aggregate
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.num_food = num_food
+        self.food_interval = food_interval
+        self.depletion_interval = depletion_interval
+        self.fixed_environment = fixed_environment
+
+    def environment_seeds(self, generation):
+        generation = 0 if self.fixed_environment else generation
+        return [derive_seed({"generation": generation, "environment": env}, self.seed)
+                for env in range(self.environments)]
+
+    def evaluate(self, dots, steps, generation):
+        if not dots:
+            return np.empty((0, 2))
+        first = dots[0].network
+        batch = EnvironmentBatch(
+            np.stack([d.network.genome for d in dots]),
+            [d.speed for d in dots],
+            [(START_FOOD, float(START_FOOD))] * len(dots),
+            self.environment_seeds(generation),
+            self.width, self.height, self.num_food, self.food_interval, self.depletion_interval,
+            network_shape=(first.input_size, first.hidden_size, first.output_size))
+        results = batch.run(steps)
+        log.debug("Generation %d: %d environments ran %d steps; %d of %d dots survived in all of them.",
+                  generation, len(batch), batch.steps, int(batch.alive.all(axis=0).sum()), len(dots))
+        return AGGREGATES[self.aggregate](results, axis=0)
+
+    def close(self):
+        pass
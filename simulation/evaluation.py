@@ -0,0 +1,188 @@
+# simulation/evaluation.py
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from algorithms.neural_network import SimpleNeuralNetwork
+from simulation.engine import Dot, Simulation
+from simulation.experiments import derive_seed
+from simulation.log import get_logger, quiet
+
+log = get_logger("evaluation")
+
+# Every evaluated dot starts with this much food, wherever it came from
+START_FOOD = 5
+
+def evaluate_batch(task):
+    # Runs one batch of genomes in a fresh copy of the world and returns an
+    # (N, 2) array of final food_eaten and max_food_eaten per genome. The
+    # start state is canonical: food, then starting positions come from the
+    # environment seed and every dot starts with START_FOOD, so the result
+    # depends only on the genomes, speeds and environment.
+    simulation = Simulation(task["width"], task["height"], steps_per_generation=task["steps"], lineage=False,
+                            seed=task["seed"])
+
+    dots = []
+    with quiet():
+        simulation.add_food_cluster()
+        simulation.add_food(task["num_food"])
+        n = len(task["genomes"])
+        xs = simulation.rng.world.integers(0, task["width"], n).tolist()
+        ys = simulation.rng.world.integers(0, task["height"], n).tolist()
+        for genome, speed, x, y in zip(task["genomes"], task["speeds"], xs, ys):
+            dot = Dot(x, y, speed, network=SimpleNeuralNetwork(genome=genome))
+            dot.food_eaten = START_FOOD
+            dot.max_food_eaten = float(START_FOOD)
+            simulation.lineage.add(dot)
+            dots.append(dot)
+        simulation.dots = list(dots)
+
+        food_interval = task["food_interval"]
+        depletion_interval = task["depletion_interval"]
+        for step in range(1, task["steps"] + 1):
+            if not simulation.dots:
+                break
+            simulation.move_dots()
+            if food_interval and step % food_interval == 0:
+                simulation.add_food_periodically()
+            if depletion_interval and step % depletion_interval == 0:
+                simulation.deplete_food()
+
+    return np.array([[d.food_eaten, d.max_food_eaten] for d in dots], dtype=np.float64).reshape(-1, 2)
+
+class FitnessCache:
+    # LRU map from a content hash of everything an evaluation depends on to
+    # its (N, 2) result. Only valid while evaluation is deterministic for a
+    # given environment seed, which it is for evaluate_batch.
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self._entries), "hit_rate": round(self.hit_rate, 4)}
+
+def evaluation_key(environment, genomes, speeds):
+    # Genomes are hashed by content, so a carried-over elite or identical
+    # children bred separately share an entry. The start state is derived
+    # from the environment, so it needs no place in the key.
+    digest = hashlib.blake2b(repr(environment).encode(), digest_size=16)
+    for array in (genomes, speeds):
+        digest.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+    return digest.digest()
+
+class ParallelEvaluator:
+    # Evaluates a generation on a process pool. Workers only receive the stacked
+    # genome and speed arrays, and only send back fitness.
+    # Batches already evaluated in the same environment come from the fitness
+    # cache instead (cache_size=0 turns it off). With fixed_environment every
+    # generation gets the same food layout, so carried-over elites can hit too.
+    def __init__(self, workers=None, batch_size=1, seed=0, width=600, height=400,
+                 num_food=20, food_interval=50, depletion_interval=200,
+                 cache_size=4096, fixed_environment=False):
+        self.workers = workers
+        self.batch_size = max(1, batch_size)
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.num_food = num_food
+        self.food_interval = food_interval
+        self.depletion_interval = depletion_interval
+        self.fixed_environment = fixed_environment
+        self.cache = FitnessCache(cache_size) if cache_size else None
+        self._executor = None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def evaluate(self, dots, steps, generation):
+        if not dots:
+            return np.empty((0, 2))
+        genomes = np.stack([d.network.genome for d in dots])
+        speeds = np.array([d.speed for d in dots], dtype=np.float64)
+
+        # Every batch of a generation sees the same food layout
+        env_seed = derive_seed({"generation": 0 if self.fixed_environment else generation}, self.seed)
+        environment = (env_seed, steps, self.width, self.height, self.num_food,
+                       self.food_interval, self.depletion_interval)
+        results = [None] * len(range(0, len(dots), self.batch_size))
+        keys = [None] * len(results)
+        tasks = []
+        pending = {}
+        for batch, start in enumerate(range(0, len(dots), self.batch_size)):
+            end = start + self.batch_size
+            if self.cache is not None:
+                key = evaluation_key(environment, genomes[start:end], speeds[start:end])
+                keys[batch] = key
+                if key in pending:
+                    # Duplicate of a batch already queued in this call
+                    pending[key].append(batch)
+                    self.cache.hits += 1
+                    continue
+                results[batch] = self.cache.get(key)
+                if results[batch] is not None:
+                    continue
+                pending[key] = [batch]
+            tasks.append({
+                "batch": batch,
+                "seed": env_seed,
+                "genomes": genomes[start:end],
+                "speeds": speeds[start:end],
+                "steps": steps,
+                "width": self.width,
+                "height": self.height,
+                "num_food": self.num_food,
+                "food_interval": self.food_interval,
+                "depletion_interval": self.depletion_interval,
+            })
+
+        for task, result in zip(tasks, self.executor.map(evaluate_batch, tasks)):
+            batch = task["batch"]
+            if self.cache is None:
+                results[batch] = result
+                continue
+            self.cache.put(keys[batch], result)
+            for duplicate in pending[keys[batch]]:
+                results[duplicate] = result
+        if self.cache is not None:
+            log.debug("Fitness cache after generation %d: %s", generation, self.cache.stats())
+        return np.concatenate(results)
+
+    def close(self):
+        if self.cache is not None:
+            stats = self.cache.stats()
+            log.info("Fitness cache: %d hits, %d misses (%.0f%% hit rate), %d evictions.",
+                     stats["hits"], stats["misses"], 100 * stats["hit_rate"], stats["evictions"])
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,113 @@
+# simulation/experiments.py
+import csv
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from algorithms.selection import make_selection
+from simulation.engine import Simulation
+from simulation.log import get_logger, quiet
+
+log = get_logger("experiments")
+
+PARAMETERS = ("population_size", "elite_size", "base_mutation_rate", "steps_per_generation", "selection")
+
+def expand_grid(grid):
+    # {"elite_size": [2, 4], ...} -> one dict per combination, in a stable order
+    unknown = set(grid) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown experiment parameters: {', '.join(sorted(unknown))}")
+    names = sorted(grid)
+    values = [grid[name] if isinstance(grid[name], list) else [grid[name]] for name in names]
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+def derive_seed(config, seed):
+    # Same config and seed always give the same run seed, whatever the worker
+    key = json.dumps(config, sort_keys=True) + f":{seed}"
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[:4], "little")
+
+def configure(simulation, config):
+    algorithm = simulation.algorithm
+    for name in ("population_size", "elite_size", "base_mutation_rate"):
+        if name in config:
+            setattr(algorithm, name, config[name])
+    algorithm.mutation_rate = algorithm.base_mutation_rate
+    if "selection" in config:
+        algorithm.selection = make_selection(config["selection"])
+    if "steps_per_generation" in config:
+        simulation.steps_per_generation = config["steps_per_generation"]
+
+def run_single(task):
+    run_seed = derive_seed(task["config"], task["seed"])
+
+    output_csv = os.path.join(task["output_dir"], f"run_{task['run_id']:04d}.csv")
+    # The CSV report appends to an existing file; the lineage and summary
+    # files are replaced when the run opens them
+    if os.path.exists(output_csv):
+        os.remove(output_csv)
+
+    simulation = Simulation(task["width"], task["height"], output_csv=output_csv, seed=run_seed)
+    configure(simulation, task["config"])
+    best_per_generation = []
+    simulation.generation_listeners.append(lambda generation, best: best_per_generation.append(best))
+
+    start = time.perf_counter()
+    # Workers inherit the parent's log handlers; only let warnings through
+    with quiet():
+        simulation.start(simulation.algorithm.population_size)
+        simulation.run(task["generations"])
+        simulation.close()
+    elapsed = time.perf_counter() - start
+
+    summary = {"run_id": task["run_id"], "seed": task["seed"], "run_seed": run_seed}
+    summary.update({name: task["config"].get(name, "") for name in PARAMETERS})
+    summary.update({
+        "generations": len(best_per_generation),
+        "final_best_fitness": round(best_per_generation[-1], 2) if best_per_generation else 0,
+        "max_best_fitness": round(max(best_per_generation), 2) if best_per_generation else 0,
+        "mean_best_fitness": round(sum(best_per_generation) / len(best_per_generation), 2) if best_per_generation else 0,
+        "elapsed_seconds": round(elapsed, 3),
+        "results_file": output_csv,
+    })
+    return summary
+
+def run_experiments(grid, seeds, generations, output_dir, workers=None, width=600, height=400):
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = []
+    for config in expand_grid(grid):
+        for seed in seeds:
+            tasks.append({
+                "run_id": len(tasks),
+                "config": config,
+                "seed": seed,
+                "generations": generations,
+                "output_dir": output_dir,
+                "width": width,
+                "height": height,
+            })
+    log.info("Running %d simulations on %d workers.", len(tasks), workers or os.cpu_count())
+
+    summaries = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_single, task) for task in tasks]
+        for future in as_completed(futures):
+            summary = future.result()
+            summaries.append(summary)
+            log.info("Run %d finished in %ss. Best fitness: %s",
+                     summary["run_id"], summary["elapsed_seconds"], summary["max_best_fitness"])
+
+    summaries.sort(key=lambda s: s["run_id"])
+    summary_csv = os.path.join(output_dir, "summary.csv")
+    if summaries:
+        with open(summary_csv, 'w', newline='') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=list(summaries[0]))
+            writer.writeheader()
+            writer.writerows(summaries)
+        log.info("Wrote summary of %d runs to %s.", len(summaries), summary_csv)
+    return summaries
+
+def load_grid(path):
+    with open(path) as f:
+        return json.load(f)
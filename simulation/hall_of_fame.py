@@ -0,0 +1,131 @@
+# simulation/hall_of_fame.py
+import os
+import struct
+import numpy as np
+from algorithms.neural_network import genome_size
+from simulation.log import get_logger
+
+log = get_logger("hall_of_fame")
+
+MAGIC = b"EVHALLOF"
+FORMAT_VERSION = 1
+# magic, version, capacity, input, hidden, output, entries in use
+FILE_HEADER = struct.Struct("<8s6i")
+
+def entry_dtype(input_size=7, hidden_size=8, output_size=2):
+    return np.dtype([
+        ("fitness", np.float64),
+        ("speed", np.float64),
+        ("generation", np.int32),
+        ("run_id", np.int64),
+        ("genome", np.float64, (genome_size(input_size, hidden_size, output_size),)),
+    ])
+
+class HallOfFame:
+    # The best genomes seen across runs, in a fixed-width file that is memory
+    # mapped: a header, then `capacity` entries kept sorted by fitness (best
+    # first), of which the first `len(self)` are in use. A run opens the
+    # archive, offers its best dots every generation and can start its
+    # population from the top entries. One writer per file at a time.
+    def __init__(self, path, capacity=100, network_shape=(7, 8, 2), min_distance=0.0):
+        self.path = path
+        self.min_distance = min_distance
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                header = f.read(FILE_HEADER.size)
+            magic, version, capacity, i, h, o, count = FILE_HEADER.unpack(header)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a version {FORMAT_VERSION} hall of fame")
+            if (i, h, o) != tuple(network_shape):
+                raise ValueError(f"{path} holds {i}-{h}-{o} networks, not {'-'.join(map(str, network_shape))}")
+            self.network_shape = (i, h, o)
+            self.dtype = entry_dtype(i, h, o)
+            self.count = count
+            log.info("Opened hall of fame %s with %d of %d entries.", path, count, capacity)
+        else:
+            self.network_shape = tuple(network_shape)
+            self.dtype = entry_dtype(*network_shape)
+            self.count = 0
+            with open(path, 'wb') as f:
+                f.write(FILE_HEADER.pack(MAGIC, FORMAT_VERSION, capacity, *network_shape, 0))
+                f.truncate(FILE_HEADER.size + capacity * self.dtype.itemsize)
+            log.info("Created hall of fame %s for %d entries.", path, capacity)
+        self.capacity = capacity
+        self.entries = np.memmap(path, dtype=self.dtype, mode='r+', offset=FILE_HEADER.size, shape=(capacity,))
+
+    def __len__(self):
+        return self.count
+
+    def _write_count(self):
+        with open(self.path, 'r+b') as f:
+            f.write(FILE_HEADER.pack(MAGIC, FORMAT_VERSION, self.capacity, *self.network_shape, self.count))
+
+    def add(self, genomes, speeds, fitness, generation, run_id):
+        # Offers candidates; returns how many of them made it in. A candidate
+        # closer than min_distance to a fitter entry (or an identical genome)
+        # is dropped, so the archive does not fill up with one family.
+        fitness = np.asarray(fitness, dtype=np.float64)
+        if not len(fitness):
+            return 0
+        if self.count == self.capacity and fitness.max() <= self.entries["fitness"][-1]:
+            return 0
+        candidates = np.zeros(len(fitness), dtype=self.dtype)
+        candidates["fitness"] = fitness
+        candidates["speed"] = speeds
+        candidates["generation"] = generation
+        candidates["run_id"] = run_id
+        candidates["genome"] = genomes
+
+        merged = np.concatenate((np.array(self.entries[:self.count]), candidates))
+        # Existing entries win ties, so the archive only changes for better genomes
+        order = np.argsort(-merged["fitness"], kind="stable")
+        kept = []
+        for i in order.tolist():
+            if len(kept) == self.capacity:
+                break
+            if kept:
+                diff = merged["genome"][kept] - merged["genome"][i]
+                if np.sqrt(np.einsum("ij,ij->i", diff, diff)).min() <= self.min_distance:
+                    continue
+            kept.append(i)
+        admitted = sum(1 for i in kept if i >= self.count)
+        if admitted:
+            self.count = len(kept)
+            self.entries[:self.count] = merged[kept]
+            self.entries.flush()
+            self._write_count()
+            log.debug("Admitted %d genomes to the hall of fame; best fitness %.2f.",
+                      admitted, float(self.entries["fitness"][0]))
+        return admitted
+
+    def add_dots(self, dots, generation, run_id):
+        dots = [d for d in dots if d.network is not None]
+        if not dots:
+            return 0
+        return self.add(np.stack([d.network.genome for d in dots]), [d.speed for d in dots],
+                        [d.food_eaten for d in dots], generation, run_id)
+
+    def top(self, k):
+        # Copy of the best k entries, best first
+        return np.array(self.entries[:min(k, self.count)])
+
+    def nearest(self, genome, k=1):
+        # (rows, distances) of the k archived genomes closest to `genome` in
+        # weight space, closest first
+        if not self.count:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        diff = self.entries["genome"][:self.count] - np.asarray(genome, dtype=np.float64)
+        distances = np.sqrt(np.einsum("ij,ij->i", diff, diff))
+        k = min(k, self.count)
+        rows = np.argpartition(distances, k - 1)[:k]
+        rows = rows[np.argsort(distances[rows], kind="stable")]
+        return rows, distances[rows]
+
+    def close(self):
+        if self.entries is not None:
+            self.entries.flush()
+            self.entries = None
+
+def run_id(seed):
+    # Archive run id for a RandomStreams seed, which can be wider than 64 bits
+    return int(seed) % (1 << 63)
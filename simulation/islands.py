@@ -0,0 +1,164 @@
+# simulation/islands.py
+import csv
+import multiprocessing
+import os
+import time
+import traceback
+import numpy as np
+from algorithms.neural_network import SimpleNeuralNetwork
+from simulation.engine import Dot, Simulation
+from simulation.experiments import configure, derive_seed
+from simulation.log import get_logger, quiet
+
+log = get_logger("islands")
+
+TOPOLOGIES = ("ring", "random")
+SUMMARY_FIELDS = ["island", "generation", "best_fitness", "population", "migrants_in"]
+
+def migration_targets(islands, topology, epoch, seed=0):
+    # Maps every island to the island its emigrants go to. Both topologies are
+    # a single cycle through all islands, so each island also receives exactly
+    # one group per exchange; "random" reshuffles the cycle every exchange,
+    # from a seed every process derives the same way.
+    if topology == "ring":
+        order = list(range(islands))
+    elif topology == "random":
+        order = np.random.default_rng(derive_seed({"migration": epoch}, seed)).permutation(islands).tolist()
+    else:
+        raise ValueError(f"Unknown topology {topology!r}; choose from {', '.join(TOPOLOGIES)}")
+    return {order[i]: order[(i + 1) % islands] for i in range(islands)}
+
+def accept_migrants(simulation, genomes, speeds):
+    # Immigrants replace the tail of the freshly bred population; the elites
+    # at the front stay. They arrive at random positions with full food.
+    dots = simulation.dots
+    count = min(len(genomes), max(len(dots) - simulation.algorithm.elite_size, 0))
+    migrants = []
+    world = simulation.rng.world
+    for genome, speed in zip(genomes[:count], speeds[:count].tolist()):
+        x = int(world.integers(0, simulation.width))
+        y = int(world.integers(0, simulation.height))
+        dot = Dot(x, y, speed, network=SimpleNeuralNetwork(genome=genome.copy()),
+                  birth_generation=simulation.algorithm.generation)
+        simulation.lineage.add(dot)
+        migrants.append(dot)
+    if count:
+        simulation.dots = dots[:len(dots) - count] + migrants
+        simulation.pending_log_ids.update(d.id for d in migrants)
+    return count
+
+def run_island(task, inboxes, results):
+    # Process target: one Simulation with its own EvolutionAlgorithm. Every
+    # `migration_interval` generations it sends copies of its elites to the
+    # next island and waits for the group addressed to it.
+    island = task["island"]
+    try:
+        simulation = Simulation(task["width"], task["height"], output_csv=task["output_csv"],
+                                seed=derive_seed({"island": island}, task["seed"]))
+        configure(simulation, task["config"])
+        interval = task["migration_interval"]
+        arrived = {}
+
+        def on_generation(generation, best_fitness):
+            ended = generation - 1
+            migrants_in = 0
+            if interval and ended % interval == 0:
+                epoch = ended // interval
+                target = migration_targets(task["islands"], task["topology"], epoch, task["seed"])[island]
+                elites = simulation.dots[:simulation.algorithm.elite_size]
+                inboxes[target].put((epoch, np.stack([d.network.genome for d in elites]),
+                                     np.array([d.speed for d in elites], dtype=np.float64)))
+                while epoch not in arrived:
+                    sent_epoch, genomes, speeds = inboxes[island].get()
+                    arrived[sent_epoch] = (genomes, speeds)
+                migrants_in = accept_migrants(simulation, *arrived.pop(epoch))
+            results.put(("generation", island, ended, best_fitness, len(simulation.dots), migrants_in))
+
+        simulation.generation_listeners.append(on_generation)
+        with quiet():
+            simulation.start(simulation.algorithm.population_size)
+            simulation.run(task["generations"])
+            simulation.close()
+        results.put(("done", island))
+    except Exception:
+        results.put(("error", island, traceback.format_exc()))
+
+class IslandModel:
+    # Runs `islands` independent populations in separate processes with
+    # periodic elite migration. Each island writes its own report
+    # (island_NN.csv); the parent collects every island's generation summary
+    # into islands.csv and passes it to generation_listeners as
+    # (island, generation, best_fitness).
+    def __init__(self, islands=4, migration_interval=5, topology="ring", seed=0, config=None,
+                 output_dir="islands", width=600, height=400):
+        if topology not in TOPOLOGIES:
+            raise ValueError(f"Unknown topology {topology!r}; choose from {', '.join(TOPOLOGIES)}")
+        self.islands = islands
+        self.migration_interval = migration_interval
+        self.topology = topology
+        self.seed = seed
+        self.config = config or {}
+        self.output_dir = output_dir
+        self.width = width
+        self.height = height
+        self.generation_listeners = []
+
+    def run(self, generations):
+        os.makedirs(self.output_dir, exist_ok=True)
+        inboxes = [multiprocessing.Queue() for _ in range(self.islands)]
+        results = multiprocessing.Queue()
+        processes = []
+        for island in range(self.islands):
+            output_csv = os.path.join(self.output_dir, f"island_{island:02d}.csv")
+            # Only the CSV report appends; lineage and summary files start over
+            if os.path.exists(output_csv):
+                os.remove(output_csv)
+            task = {
+                "island": island,
+                "islands": self.islands,
+                "migration_interval": self.migration_interval,
+                "topology": self.topology,
+                "seed": self.seed,
+                "config": self.config,
+                "generations": generations,
+                "output_csv": output_csv,
+                "width": self.width,
+                "height": self.height,
+            }
+            process = multiprocessing.Process(target=run_island, args=(task, inboxes, results), daemon=True)
+            process.start()
+            processes.append(process)
+        log.info("Started %d islands, migrating every %d generations in a %s topology.",
+                 self.islands, self.migration_interval, self.topology)
+
+        start = time.perf_counter()
+        summary_csv = os.path.join(self.output_dir, "islands.csv")
+        best = {}
+        running = self.islands
+        try:
+            with open(summary_csv, 'w', newline='') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(SUMMARY_FIELDS)
+                while running:
+                    message = results.get()
+                    if message[0] == "error":
+                        raise RuntimeError(f"Island {message[1]} failed:\n{message[2]}")
+                    if message[0] == "done":
+                        running -= 1
+                        continue
+                    _, island, generation, best_fitness, population, migrants_in = message
+                    writer.writerow([island, generation, round(best_fitness, 2), population, migrants_in])
+                    best[island] = max(best.get(island, best_fitness), best_fitness)
+                    log.info("Island %d generation %d ended. Best fitness: %.2f%s", island, generation,
+                             best_fitness, f", {migrants_in} migrants arrived" if migrants_in else "")
+                    for listener in self.generation_listeners:
+                        listener(island, generation, best_fitness)
+        finally:
+            for process in processes:
+                if process.is_alive() and running:
+                    process.terminate()
+                process.join()
+
+        log.info("Islands finished %d generations in %.1fs. Best fitness per island: %s", generations,
+                 time.perf_counter() - start, ", ".join(f"{i}: {b:.2f}" for i, b in sorted(best.items())))
+        return best
@@ -0,0 +1,148 @@
+# simulation/lineage.py
+import math
+import os
+import numpy as np
+
+RECORD_DTYPE = np.dtype([
+    ("dot_id", np.int64),
+    ("birth_generation", np.int32),
+    ("parent1", np.int64),
+    ("parent2", np.int64),
+    ("food_eaten", np.float64),
+    ("max_food_eaten", np.float64),
+    ("food_when_died", np.float64),
+])
+
+class LineageRecord:
+    __slots__ = ("dot_id", "birth_generation", "parent1", "parent2",
+                 "food_eaten", "max_food_eaten", "food_when_died")
+
+    def __init__(self, dot_id, birth_generation, parent1=-1, parent2=-1,
+                 food_eaten=5, max_food_eaten=5.0, food_when_died=None):
+        self.dot_id = dot_id
+        self.birth_generation = birth_generation
+        self.parent1 = parent1
+        self.parent2 = parent2
+        self.food_eaten = food_eaten
+        self.max_food_eaten = max_food_eaten
+        self.food_when_died = food_when_died
+
+    def as_tuple(self):
+        died = math.nan if self.food_when_died is None else self.food_when_died
+        return (self.dot_id, self.birth_generation, self.parent1, self.parent2,
+                self.food_eaten, self.max_food_eaten, died)
+
+    @classmethod
+    def from_row(cls, row):
+        died = None if math.isnan(row["food_when_died"]) else float(row["food_when_died"])
+        return cls(int(row["dot_id"]), int(row["birth_generation"]), int(row["parent1"]),
+                   int(row["parent2"]), float(row["food_eaten"]), float(row["max_food_eaten"]), died)
+
+class LineageStore:
+    # Per-dot summaries (no Dot or network references), indexed by the
+    # generation a dot was created in. Generations that can no longer change
+    # are appended to a fixed-width binary file and dropped from memory, so
+    # memory stays proportional to the live population.
+    def __init__(self, path=None):
+        self.path = path
+        self.records = {}
+        self.by_generation = {}
+        self.spilled = {}
+        self.spilled_rows = 0
+        self._file = None
+
+    def __len__(self):
+        return len(self.records) + self.spilled_rows
+
+    def __contains__(self, dot_id):
+        return dot_id in self.records
+
+    def __getitem__(self, dot_id):
+        return self.records[dot_id]
+
+    def add(self, dot):
+        parents = getattr(dot, "parent_ids", ())
+        parent1 = parents[0] if len(parents) > 0 else -1
+        parent2 = parents[1] if len(parents) > 1 else -1
+        record = LineageRecord(dot.id, dot.birth_generation, parent1, parent2,
+                               dot.food_eaten, dot.max_food_eaten)
+        self.records[dot.id] = record
+        self.by_generation.setdefault(dot.birth_generation, set()).add(dot.id)
+        return record
+
+    def update(self, dot):
+        record = self.records[dot.id]
+        record.food_eaten = dot.food_eaten
+        record.max_food_eaten = dot.max_food_eaten
+        if record.birth_generation != dot.birth_generation:
+            # Elites carried into a new generation are stamped with it
+            self.by_generation[record.birth_generation].discard(dot.id)
+            record.birth_generation = dot.birth_generation
+            self.by_generation.setdefault(dot.birth_generation, set()).add(dot.id)
+        return record
+
+    def record_death(self, dot):
+        record = self.update(dot)
+        if record.food_when_died is None:
+            record.food_when_died = round(dot.food_eaten, 2)
+            return True
+        return False
+
+    def generation(self, generation):
+        # All dots created in the given generation, in id order
+        if generation in self.spilled:
+            offset, count = self.spilled[generation]
+            if self._file is not None:
+                self._file.flush()
+            rows = np.fromfile(self.path, dtype=RECORD_DTYPE, count=count,
+                               offset=offset * RECORD_DTYPE.itemsize)
+            return [LineageRecord.from_row(row) for row in rows]
+        ids = sorted(self.by_generation.get(generation, ()))
+        return [self.records[dot_id] for dot_id in ids]
+
+    def spill_before(self, generation):
+        # Write out every generation older than the given one
+        for old in sorted(g for g in self.by_generation if g < generation):
+            ids = sorted(self.by_generation.pop(old))
+            records = [self.records.pop(dot_id) for dot_id in ids]
+            if self.path is None or not records:
+                continue
+            if self._file is None:
+                self._file = open(self.path, 'wb')
+            rows = np.array([r.as_tuple() for r in records], dtype=RECORD_DTYPE)
+            rows.tofile(self._file)
+            self.spilled[old] = (self.spilled_rows, len(rows))
+            self.spilled_rows += len(rows)
+        if self._file is not None:
+            self._file.flush()
+
+    def state(self):
+        # In-memory records and the (generation, offset, count) spill index
+        records = np.array([r.as_tuple() for r in self.records.values()], dtype=RECORD_DTYPE)
+        spilled = np.array([(g, offset, count) for g, (offset, count) in sorted(self.spilled.items())],
+                           dtype=np.int64).reshape(-1, 3)
+        return records, spilled
+
+    def restore(self, records, spilled):
+        self.records = {}
+        self.by_generation = {}
+        for row in records:
+            record = LineageRecord.from_row(row)
+            self.records[record.dot_id] = record
+            self.by_generation.setdefault(record.birth_generation, set()).add(record.dot_id)
+        self.spilled = {int(g): (int(offset), int(count)) for g, offset, count in spilled}
+        self.spilled_rows = sum(count for _, count in self.spilled.values())
+        self.close()
+        if self.path is not None and os.path.exists(self.path):
+            # Continue the spill file where the checkpoint left it
+            self._file = open(self.path, 'r+b')
+            self._file.truncate(self.spilled_rows * RECORD_DTYPE.itemsize)
+            self._file.seek(0, os.SEEK_END)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def lineage_path(report_path):
+    return os.path.splitext(report_path)[0] + ".lineage"
@@ -0,0 +1,118 @@
+# simulation/log.py
+import contextlib
+import json
+import logging
+import time
+
+# Subsystem loggers all hang off "evolution", e.g. "evolution.engine",
+# "evolution.algorithm", "evolution.gui". Per-dot messages go to
+# "evolution.dots" and are only formatted when DEBUG is enabled for it.
+# Analysed events (deaths, collisions, generation summaries) go to
+# "evolution.events", which is silent unless an event stream is attached.
+ROOT = "evolution"
+DOTS = ROOT + ".dots"
+EVENTS = ROOT + ".events"
+
+def get_logger(name):
+    return logging.getLogger(f"{ROOT}.{name}")
+
+_events = logging.getLogger(EVENTS)
+_events.propagate = False
+_events.setLevel(logging.WARNING)
+
+def events_enabled():
+    return _events.isEnabledFor(logging.INFO)
+
+def event(name, **fields):
+    # Callers on the hot path should check events_enabled() first
+    _events.info(name, extra={"event_fields": fields})
+
+class SampleFilter(logging.Filter):
+    # Keeps every n-th record. Counter based, so it never touches the
+    # simulation's random number generators.
+    def __init__(self, rate):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self.seen = 0
+
+    def filter(self, record):
+        if not self.every:
+            return False
+        self.seen += 1
+        return (self.seen - 1) % self.every == 0
+
+class RateLimitFilter(logging.Filter):
+    # Token bucket allowing at most `per_second` records per second
+    def __init__(self, per_second):
+        super().__init__()
+        self.per_second = per_second
+        self.tokens = per_second
+        self.last = time.monotonic()
+
+    def filter(self, record):
+        now = time.monotonic()
+        self.tokens = min(self.per_second, self.tokens + (now - self.last) * self.per_second)
+        self.last = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+class JsonLinesHandler(logging.Handler):
+    # One compact JSON object per event: {"t": ..., "event": ..., **fields}
+    def __init__(self, path):
+        super().__init__()
+        self.stream = open(path, 'a', buffering=1 << 16)
+
+    def emit(self, record):
+        try:
+            payload = {"t": round(record.created, 6), "event": record.getMessage()}
+            payload.update(getattr(record, "event_fields", {}))
+            self.stream.write(json.dumps(payload, separators=(",", ":")) + "\n")
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.stream.flush()
+
+    def close(self):
+        self.stream.close()
+        super().close()
+
+def configure_logging(level="INFO", dot_level="WARNING", sample=1.0, rate_limit=None,
+                      events_path=None):
+    root = logging.getLogger(ROOT)
+    root.setLevel(level)
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        root.addHandler(handler)
+
+    dots = logging.getLogger(DOTS)
+    dots.setLevel(dot_level)
+    dots.filters = []
+    if sample < 1.0:
+        dots.addFilter(SampleFilter(sample))
+    if rate_limit:
+        dots.addFilter(RateLimitFilter(rate_limit))
+
+    for handler in list(_events.handlers):
+        _events.removeHandler(handler)
+        handler.close()
+    if events_path:
+        _events.addHandler(JsonLinesHandler(events_path))
+        _events.setLevel(logging.INFO)
+    else:
+        _events.setLevel(logging.WARNING)
+
+@contextlib.contextmanager
+def quiet(level=logging.WARNING):
+    # Raises the subsystem loggers' threshold for the duration of the block,
+    # e.g. inside worker processes that inherited the parent's handlers.
+    root = logging.getLogger(ROOT)
+    previous = root.level
+    root.setLevel(level)
+    try:
+        yield
+    finally:
+        root.setLevel(previous)
@@ -0,0 +1,182 @@
+# simulation/profiling.py
+import bisect
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from simulation.log import get_logger
+
+log = get_logger("profiling")
+
+# Upper bounds of the timing histogram buckets in seconds, 1 us to about 17 s
+BUCKETS = tuple(1e-6 * 2**k for k in range(25))
+
+class Histogram:
+    # Fixed-bucket timing histogram, the same shape Prometheus expects
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+class Lap:
+    # Times consecutive phases: every call records the time since the
+    # previous one under the given phase name
+    __slots__ = ("profiler", "last")
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.last = time.perf_counter()
+
+    def __call__(self, phase):
+        now = time.perf_counter()
+        self.profiler.observe(phase, now - self.last)
+        self.last = now
+
+class Profiler:
+    # Per-phase timing histograms, counters and gauges. Instrumented code
+    # asks for lap() once per call and checks it against None, so a disabled
+    # profiler costs one attribute test per step.
+    def __init__(self):
+        self.enabled = False
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.reset()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.counters = {}
+            self.gauges = {}
+            self.started = time.perf_counter()
+
+    def lap(self):
+        return Lap(self) if self.enabled else None
+
+    def observe(self, phase, seconds):
+        histogram = self.histograms.get(phase)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(phase, Histogram())
+        histogram.observe(seconds)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, value):
+        self.gauges[name] = value
+
+    def snapshot(self):
+        # Everything collected so far as plain data
+        elapsed = time.perf_counter() - self.started
+        with self._lock:
+            histograms = dict(self.histograms)
+        gauges = dict(self.gauges)
+        gauges["steps_per_second"] = self.counters.get("steps", 0) / elapsed if elapsed > 0 else 0.0
+        return {
+            "elapsed_seconds": elapsed,
+            "counters": dict(self.counters),
+            "gauges": gauges,
+            "phases": {name: {"count": h.count, "sum": h.sum, "mean": h.sum / h.count if h.count else 0.0,
+                              "p50": h.quantile(0.5), "p95": h.quantile(0.95), "p99": h.quantile(0.99),
+                              "buckets": list(h.counts)}
+                       for name, h in sorted(histograms.items())},
+        }
+
+    def prometheus(self):
+        # Prometheus text exposition format
+        data = self.snapshot()
+        lines = ["# TYPE evolution_phase_seconds histogram"]
+        for phase, h in data["phases"].items():
+            cumulative = 0
+            for bound, n in zip(BUCKETS + (float("inf"),), h["buckets"]):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else f"{bound:.9g}"
+                lines.append(f'evolution_phase_seconds_bucket{{phase="{phase}",le="{le}"}} {cumulative}')
+            lines.append(f'evolution_phase_seconds_sum{{phase="{phase}"}} {h["sum"]:.9g}')
+            lines.append(f'evolution_phase_seconds_count{{phase="{phase}"}} {h["count"]}')
+        for name, value in sorted(data["counters"].items()):
+            lines.append(f"# TYPE evolution_{name}_total counter")
+            lines.append(f"evolution_{name}_total {value}")
+        for name, value in sorted(data["gauges"].items()):
+            lines.append(f"# TYPE evolution_{name} gauge")
+            lines.append(f"evolution_{name} {value:.9g}")
+        return "\n".join(lines) + "\n"
+
+    def report(self):
+        # Human-readable table for --profile. Phases nest (a step contains
+        # sense, forward, ...), so the share is of the wall time, not of a total.
+        data = self.snapshot()
+        total = data["elapsed_seconds"] or 1.0
+        lines = [f"{'phase':<12} {'calls':>9} {'total s':>9} {'of run':>7} {'mean ms':>9} {'p95 ms':>9}"]
+        for phase, h in sorted(data["phases"].items(), key=lambda item: -item[1]["sum"]):
+            lines.append(f"{phase:<12} {h['count']:>9} {h['sum']:>9.3f} {h['sum'] / total:>7.1%} "
+                         f"{h['mean'] * 1e3:>9.3f} {h['p95'] * 1e3:>9.3f}")
+        counters = ", ".join(f"{name}: {value}" for name, value in sorted(data["counters"].items()))
+        lines.append(f"{data['elapsed_seconds']:.1f}s, {data['gauges']['steps_per_second']:.1f} steps/s. {counters}")
+        return "\n".join(lines)
+
+# The process-wide profiler every instrumented phase reports to
+PROFILER = Profiler()
+
+class MetricsServer:
+    # Serves PROFILER on localhost: /metrics in Prometheus text format and
+    # /metrics.json as JSON. Runs on a daemon thread until stop().
+    def __init__(self, port=9100, host="127.0.0.1", profiler=PROFILER):
+        profiler_ = profiler
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, kind = profiler_.prometheus().encode(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, kind = json.dumps(profiler_.snapshot()).encode(), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", kind)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                log.debug("Metrics request: " + format, *args)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        log.info("Serving metrics on http://%s:%d/metrics", self.server.server_address[0], self.port)
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
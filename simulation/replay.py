@@ -0,0 +1,255 @@
+# simulation/replay.py
+import os
+import struct
+import numpy as np
+from simulation.log import get_logger
+
+log = get_logger("replay")
+
+MAGIC = b"EVREPLAY"
+FORMAT_VERSION = 1
+# Positions are stored in fixed point: 1/QUANT of a pixel
+QUANT = 16
+KEYFRAME_EVERY = 250
+
+FILE_HEADER = struct.Struct("<8s5i")
+# total_steps, generation, current_step, kind, dots, food added, food removed
+FRAME_HEADER = struct.Struct("<qiiBiii")
+KEYFRAME, DELTA = 0, 1
+
+INDEX_DTYPE = np.dtype([
+    ("total_step", np.int64),
+    ("generation", np.int32),
+    ("step", np.int32),
+    ("offset", np.int64),
+    ("keyframe", np.int64),
+])
+
+def index_path(path):
+    return path + ".idx"
+
+class ReplayRecorder:
+    # Appends one frame per simulation tick. A keyframe holds the roster of
+    # dot ids, absolute positions and the whole food list; the frames after it
+    # hold int16 position deltas for the same roster, packed alive bits and
+    # the food added or removed since the previous frame. A new keyframe is
+    # written every `keyframe_every` frames, at every new generation and
+    # whenever the roster changes. The frame index is written next to the
+    # file on flush() and close().
+    def __init__(self, path, width, height, keyframe_every=KEYFRAME_EVERY):
+        self.path = path
+        self.keyframe_every = max(1, keyframe_every)
+        self._file = open(path, 'wb', buffering=1 << 20)
+        self._file.write(FILE_HEADER.pack(MAGIC, FORMAT_VERSION, width, height, QUANT, self.keyframe_every))
+        self._offset = FILE_HEADER.size
+        self._index = []
+        self._keyframe = -1
+        self._since_keyframe = 0
+        self._generation = None
+        self._slots = {}
+        self._q = np.empty((0, 2), dtype=np.int32)
+        self._foods = []
+        self._food_set = set()
+        self._food_grid = None
+        self._food_changes = None
+
+    def __len__(self):
+        return len(self._index)
+
+    def record(self, simulation):
+        dots = simulation.dots
+        q = np.rint(simulation.world.positions() * QUANT)
+        q = q.astype(np.int32)
+
+        rows = None
+        if (simulation.algorithm.generation == self._generation
+                and self._since_keyframe < self.keyframe_every):
+            slots = self._slots
+            rows = [slots.get(d.id) for d in dots]
+            if None in rows:
+                rows = None
+
+        if rows is not None:
+            current = self._q.copy()
+            current[rows] = q
+            delta = current - self._q
+            if len(delta) and np.abs(delta).max() > np.iinfo(np.int16).max:
+                rows = None
+
+        grid = simulation.foods
+        food_changed = grid is not self._food_grid or grid.changes != self._food_changes
+        foods = list(grid) if food_changed or rows is None else self._foods
+        if rows is None:
+            self._write_keyframe(simulation, dots, q, foods)
+        else:
+            alive = np.zeros(len(current), dtype=bool)
+            alive[rows] = True
+            self._write_delta(simulation, delta.astype(np.int16), alive, foods if food_changed else None)
+            self._q = current
+        if food_changed:
+            self._foods = foods
+            self._food_set = set(foods)
+            self._food_grid = grid
+            self._food_changes = grid.changes
+
+    def _begin_frame(self, simulation, kind, n_dots, n_added, n_removed):
+        if kind == KEYFRAME:
+            self._keyframe = len(self._index)
+            self._since_keyframe = 0
+        self._since_keyframe += 1
+        self._index.append((simulation.total_steps, simulation.algorithm.generation,
+                            simulation.current_step, self._offset, self._keyframe))
+        self._put(FRAME_HEADER.pack(simulation.total_steps, simulation.algorithm.generation,
+                                    simulation.current_step, kind, n_dots, n_added, n_removed))
+
+    def _put(self, data):
+        data = data if isinstance(data, bytes) else data.tobytes()
+        self._file.write(data)
+        self._offset += len(data)
+
+    def _write_keyframe(self, simulation, dots, q, foods):
+        self._generation = simulation.algorithm.generation
+        self._slots = {d.id: i for i, d in enumerate(dots)}
+        self._q = q
+        self._begin_frame(simulation, KEYFRAME, len(dots), len(foods), 0)
+        self._put(np.array([d.id for d in dots], dtype=np.int32))
+        self._put(q)
+        self._put(np.packbits(np.ones(len(dots), dtype=bool)))
+        self._put(np.array([(f.x, f.y) for f in foods], dtype=np.float32))
+
+    def _write_delta(self, simulation, delta, alive, foods):
+        # foods is None when the food grid has not changed since the last frame
+        known = self._food_set
+        added = [] if foods is None else [f for f in foods if f not in known]
+        if foods is None or len(foods) - len(added) == len(self._foods):
+            removed = []
+        else:
+            still_here = set(foods)
+            removed = [f for f in self._foods if f not in still_here]
+        self._begin_frame(simulation, DELTA, len(delta), len(added), len(removed))
+        self._put(delta)
+        self._put(np.packbits(alive))
+        self._put(np.array([(f.x, f.y) for f in added], dtype=np.float32))
+        self._put(np.array([(f.x, f.y) for f in removed], dtype=np.float32))
+
+    def flush(self):
+        self._file.flush()
+        index = np.array(self._index, dtype=INDEX_DTYPE)
+        tmp_path = index_path(self.path) + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, index)
+        os.replace(tmp_path, index_path(self.path))
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+        log.info("Recorded %d frames to %s.", len(self._index), self.path)
+
+class ReplayFrame:
+    __slots__ = ("total_step", "generation", "step", "dot_ids", "dot_xy", "alive", "food_xy")
+
+    def __init__(self, total_step, generation, step, dot_ids, dot_xy, alive, food_xy):
+        self.total_step = total_step
+        self.generation = generation
+        self.step = step
+        self.dot_ids = dot_ids
+        self.dot_xy = dot_xy
+        self.alive = alive
+        self.food_xy = food_xy
+
+class ReplayReader:
+    # Memory-maps a recording. frame(i) decodes forward from the nearest
+    # keyframe found through the index, or from the last decoded frame when
+    # playing forwards, so any step is reachable without scanning the file.
+    def __init__(self, path):
+        self.path = path
+        self._data = np.memmap(path, dtype=np.uint8, mode='r')
+        magic, version, self.width, self.height, self.quant, self.keyframe_every = \
+            FILE_HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} replay file")
+        if os.path.exists(index_path(path)):
+            self.index = np.load(index_path(path), mmap_mode='r')
+        else:
+            log.warning("No index for %s; rebuilding it from the frame headers.", path)
+            self.index = self._scan()
+        self._position = None
+        self._state = None
+
+    def __len__(self):
+        return len(self.index)
+
+    def find(self, total_step):
+        # Index of the last frame recorded at or before `total_step`
+        i = int(np.searchsorted(self.index["total_step"], total_step, side="right")) - 1
+        return max(i, 0)
+
+    def frame(self, i):
+        if not 0 <= i < len(self.index):
+            raise IndexError(f"frame {i} out of range")
+        start = int(self.index["keyframe"][i])
+        if self._position is None or not start <= self._position <= i:
+            self._position = start
+            self._state = self._decode(start, None)
+        while self._position < i:
+            self._position += 1
+            self._state = self._decode(self._position, self._state)
+
+        ids, q, alive, foods = self._state
+        entry = self.index[i]
+        food_xy = np.array(foods, dtype=np.float64).reshape(-1, 2)
+        return ReplayFrame(int(entry["total_step"]), int(entry["generation"]), int(entry["step"]),
+                           ids.copy(), q / self.quant, alive.copy(), food_xy)
+
+    def _array(self, offset, dtype, count):
+        end = offset + np.dtype(dtype).itemsize * count
+        return np.frombuffer(self._data[offset:end], dtype=dtype), end
+
+    def _decode(self, i, state):
+        offset = int(self.index["offset"][i])
+        _, _, _, kind, n, n_added, n_removed = FRAME_HEADER.unpack_from(self._data, offset)
+        offset += FRAME_HEADER.size
+        if kind == KEYFRAME:
+            ids, offset = self._array(offset, np.int32, n)
+            q, offset = self._array(offset, np.int32, 2 * n)
+            q = q.reshape(-1, 2).copy()
+            foods = []
+        else:
+            ids, q, _, foods = state
+            delta, offset = self._array(offset, np.int16, 2 * n)
+            q = q + delta.reshape(-1, 2)
+            foods = list(foods)
+        bits, offset = self._array(offset, np.uint8, (n + 7) // 8)
+        alive = np.unpackbits(bits, count=n).astype(bool)
+        added, offset = self._array(offset, np.float32, 2 * n_added)
+        removed, offset = self._array(offset, np.float32, 2 * n_removed)
+        for food in map(tuple, removed.reshape(-1, 2).tolist()):
+            foods.remove(food)
+        foods.extend(map(tuple, added.reshape(-1, 2).tolist()))
+        return ids, q, alive, foods
+
+    def _scan(self):
+        entries = []
+        offset = FILE_HEADER.size
+        keyframe = -1
+        while offset + FRAME_HEADER.size <= len(self._data):
+            total_step, generation, step, kind, n, n_added, n_removed = \
+                FRAME_HEADER.unpack_from(self._data, offset)
+            if kind == KEYFRAME:
+                keyframe = len(entries)
+                size = 4 * n + 8 * n
+            else:
+                size = 4 * n
+            size += (n + 7) // 8 + 8 * (n_added + n_removed)
+            if offset + FRAME_HEADER.size + size > len(self._data):
+                break  # truncated final frame
+            entries.append((total_step, generation, step, offset, keyframe))
+            offset += FRAME_HEADER.size + size
+        return np.array(entries, dtype=INDEX_DTYPE)
+
+    def close(self):
+        self._data = None
+        self.index = None
@@ -0,0 +1,117 @@
+# simulation/report.py
+import csv
+import os
+from simulation.log import get_logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pa = None
+
+log = get_logger("report")
+
+FIELDNAMES = ["generation", "dot_id", "food_eaten", "highest_food", "food_when_died", "lifetime_steps", "status", "generation_created"]
+
+FORMATS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+
+def report_schema():
+    return pa.schema([
+        ("generation", pa.int32()),
+        ("dot_id", pa.int64()),
+        ("food_eaten", pa.float64()),
+        ("highest_food", pa.float64()),
+        ("food_when_died", pa.float64()),
+        ("lifetime_steps", pa.int64()),
+        ("status", pa.dictionary(pa.int8(), pa.string())),
+        ("generation_created", pa.int32()),
+    ])
+
+def report_path(path, fmt):
+    root, ext = os.path.splitext(path)
+    if ext in FORMATS.values() and ext != FORMATS[fmt]:
+        return root + FORMATS[fmt]
+    return path
+
+class ReportWriter:
+    # Buffers report rows and writes them in bulk. The output file is opened
+    # lazily on the first flush and kept open until close(). Parquet and Arrow
+    # IPC (Feather v2) output need pyarrow.
+    def __init__(self, path, fmt="csv", flush_rows=5000):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown report format: {fmt}")
+        if fmt != "csv" and pa is None:
+            raise RuntimeError(f"The {fmt} report format requires pyarrow.")
+        self.path = report_path(path, fmt)
+        self.format = fmt
+        self.flush_rows = flush_rows
+        self.buffer = []
+        self.rows_written = 0
+        self._file = None
+        self._writer = None
+
+    def write_rows(self, rows):
+        self.buffer.extend(rows)
+        if len(self.buffer) >= self.flush_rows:
+            self.flush()
+
+    def _open(self):
+        if self.format == "csv":
+            new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            self._file = open(self.path, 'a', newline='')
+            self._writer = csv.DictWriter(self._file, fieldnames=FIELDNAMES)
+            if new_file:
+                self._writer.writeheader()
+                log.info("Created new CSV file: %s", self.path)
+        elif self.format == "parquet":
+            self._writer = pyarrow.parquet.ParquetWriter(self.path, report_schema())
+        else:
+            self._file = pa.OSFile(self.path, 'wb')
+            self._writer = pyarrow.ipc.new_file(self._file, report_schema())
+
+    def flush(self):
+        if not self.buffer:
+            return
+        if self._writer is None:
+            self._open()
+        if self.format == "csv":
+            self._writer.writerows(self.buffer)
+            self._file.flush()
+        else:
+            columns = {name: [row[name] for row in self.buffer] for name in FIELDNAMES}
+            table = pa.Table.from_pydict(columns, schema=report_schema())
+            self._writer.write_table(table)
+        log.debug("Wrote %d records to %s.", len(self.buffer), self.path)
+        self.rows_written += len(self.buffer)
+        self.buffer = []
+
+    def tell(self):
+        # Size of the report on disk once everything buffered has been flushed
+        if self.format == "csv" and self._file is not None:
+            self._file.flush()
+            return self._file.tell()
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def truncate(self, size):
+        # Drops rows written after a checkpoint. Columnar files can't be
+        # appended to, so a resumed run writes to the next free part instead.
+        if self.format == "csv":
+            if os.path.exists(self.path):
+                with open(self.path, 'r+b') as f:
+                    f.truncate(size)
+            return
+        root, ext = os.path.splitext(self.path)
+        part = 1
+        while os.path.exists(self.path):
+            self.path = f"{root}.{part}{ext}"
+            part += 1
+
+    def close(self):
+        self.flush()
+        if self._writer is not None and self.format != "csv":
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._writer = None
@@ -0,0 +1,25 @@
+# simulation/rng.py
+import numpy as np
+
+# One independent stream per subsystem, so drawing more or fewer numbers in
+# one of them (say, a bigger food cluster) leaves the others untouched:
+#   world     - dot and food placement, food spawn counts, migrant positions
+#   genome    - initial weights, crossover cut points, mutations
+#   selection - parent selection, breeding pairs and speed jitter
+STREAMS = ("world", "genome", "selection")
+
+class RandomStreams:
+    # numpy Generators spawned from one master seed. seed=None draws fresh
+    # entropy, which is kept in `seed` so the run can be repeated.
+    def __init__(self, seed=None):
+        sequence = np.random.SeedSequence(seed)
+        self.seed = sequence.entropy
+        for name, child in zip(STREAMS, sequence.spawn(len(STREAMS))):
+            setattr(self, name, np.random.default_rng(child))
+
+    def state(self):
+        return {name: getattr(self, name).bit_generator.state for name in STREAMS}
+
+    def restore(self, state):
+        for name in STREAMS:
+            getattr(self, name).bit_generator.state = state[name]
@@ -0,0 +1,102 @@
+# simulation/snapshot.py
+import contextlib
+import threading
+import numpy as np
+
+class Snapshot:
+    # Flat arrays describing one frame. Buffers grow by doubling and are reused,
+    # so publishing a frame does not allocate once the sizes have settled.
+    def __init__(self):
+        self.generation = 0
+        self.step = 0
+        self.n_dots = 0
+        self.n_foods = 0
+        self._dot_xy = np.empty((0, 2), dtype=np.float32)
+        self._dot_ids = np.empty(0, dtype=np.int64)
+        self._dot_food = np.empty(0, dtype=np.float64)
+        self._dot_highest = np.empty(0, dtype=np.float64)
+        self._food_xy = np.empty((0, 2), dtype=np.float32)
+
+    @staticmethod
+    def _fit(array, n):
+        if len(array) >= n:
+            return array
+        return np.empty((max(n, 2 * len(array)),) + array.shape[1:], dtype=array.dtype)
+
+    def fill(self, simulation):
+        world = simulation.world
+        living = world.living()
+        foods, food_x, food_y = simulation.food_arrays()
+        n, m = len(living), len(foods)
+
+        self._dot_xy = self._fit(self._dot_xy, n)
+        self._dot_ids = self._fit(self._dot_ids, n)
+        self._dot_food = self._fit(self._dot_food, n)
+        self._dot_highest = self._fit(self._dot_highest, n)
+        self._food_xy = self._fit(self._food_xy, m)
+
+        self._dot_xy[:n, 0] = world.x[living]
+        self._dot_xy[:n, 1] = world.y[living]
+        self._dot_ids[:n] = world.ids[living]
+        self._dot_food[:n] = world.food_eaten[living]
+        self._dot_highest[:n] = world.max_food_eaten[living]
+        self._food_xy[:m, 0] = food_x
+        self._food_xy[:m, 1] = food_y
+
+        self.n_dots = n
+        self.n_foods = m
+        self.generation = simulation.algorithm.generation
+        self.step = simulation.current_step
+
+    @property
+    def dot_xy(self):
+        return self._dot_xy[:self.n_dots]
+
+    @property
+    def dot_ids(self):
+        return self._dot_ids[:self.n_dots]
+
+    @property
+    def dot_food(self):
+        return self._dot_food[:self.n_dots]
+
+    @property
+    def dot_highest(self):
+        return self._dot_highest[:self.n_dots]
+
+    @property
+    def food_xy(self):
+        return self._food_xy[:self.n_foods]
+
+class SnapshotBuffer:
+    # Double buffer between the simulation thread (publish) and the GUI thread
+    # (read). The writer only ever fills the slot the reader is not holding;
+    # if the reader still holds it, that frame is simply dropped.
+    def __init__(self):
+        self._slots = [Snapshot(), Snapshot()]
+        self._front = 0
+        self._reading = None
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def publish(self, simulation):
+        with self._lock:
+            back = 1 - self._front
+            if self._reading == back:
+                return False
+        self._slots[back].fill(simulation)
+        with self._lock:
+            self._front = back
+            self.version += 1
+        return True
+
+    @contextlib.contextmanager
+    def read(self):
+        with self._lock:
+            index = self._front
+            self._reading = index
+        try:
+            yield self._slots[index]
+        finally:
+            with self._lock:
+                self._reading = None
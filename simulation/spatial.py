@@ -0,0 +1,114 @@
+# simulation/spatial.py
+import math
+
+class FoodGrid:
+    # Uniform grid over food positions. It behaves like the plain food list the
+    # simulation used to keep (append/remove/iterate/len) and answers nearest,
+    # radius and collision queries by looking only at the cells around a point.
+    def __init__(self, cell_size=50):
+        self.cell_size = cell_size
+        self.cells = {}
+        self._items = {}
+        self._seq = 0
+        self._bounds = None
+        # Bumped on every append/remove/clear so observers can skip unchanged steps
+        self.changes = 0
+
+    def _cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def append(self, food):
+        # The insertion sequence breaks distance ties the way min() over a list did
+        key = self._cell(food.x, food.y)
+        self.cells.setdefault(key, []).append((self._seq, food))
+        self._items[id(food)] = (key, self._seq, food)
+        self._seq += 1
+        self.changes += 1
+
+        cx, cy = key
+        if self._bounds is None:
+            self._bounds = [cx, cy, cx, cy]
+        else:
+            b = self._bounds
+            b[0], b[1] = min(b[0], cx), min(b[1], cy)
+            b[2], b[3] = max(b[2], cx), max(b[3], cy)
+
+    def extend(self, foods):
+        for food in foods:
+            self.append(food)
+
+    def remove(self, food):
+        key, seq, _ = self._items.pop(id(food))
+        cell = self.cells[key]
+        cell.remove((seq, food))
+        if not cell:
+            del self.cells[key]
+        self.changes += 1
+        if not self._items:
+            self._bounds = None
+
+    def clear(self):
+        self.cells = {}
+        self._items = {}
+        self._bounds = None
+        self.changes += 1
+
+    def __contains__(self, food):
+        return id(food) in self._items
+
+    def __iter__(self):
+        return (food for _, _, food in list(self._items.values()))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def _ring(self, cx, cy, r):
+        if r == 0:
+            yield cx, cy
+            return
+        for i in range(cx - r, cx + r + 1):
+            yield i, cy - r
+            yield i, cy + r
+        for j in range(cy - r + 1, cy + r):
+            yield cx - r, j
+            yield cx + r, j
+
+    def nearest(self, x, y):
+        if not self._items:
+            return None
+        cx, cy = self._cell(x, y)
+        min_cx, min_cy, max_cx, max_cy = self._bounds
+        max_r = max(abs(cx - min_cx), abs(cx - max_cx), abs(cy - min_cy), abs(cy - max_cy))
+
+        best = None
+        best_key = None
+        for r in range(max_r + 1):
+            for key in self._ring(cx, cy, r):
+                for seq, food in self.cells.get(key, ()):
+                    d2 = (food.x - x)**2 + (food.y - y)**2
+                    if best_key is None or (d2, seq) < best_key:
+                        best_key = (d2, seq)
+                        best = food
+            # Everything in ring r+1 is at least r cells away from (x, y)
+            if best is not None and math.sqrt(best_key[0]) < r * self.cell_size:
+                break
+        return best
+
+    def within(self, x, y, radius):
+        r2 = radius * radius
+        x0, y0 = self._cell(x - radius, y - radius)
+        x1, y1 = self._cell(x + radius, y + radius)
+        for i in range(x0, x1 + 1):
+            for j in range(y0, y1 + 1):
+                for _, food in self.cells.get((i, j), ()):
+                    if (food.x - x)**2 + (food.y - y)**2 < r2:
+                        yield food
+
+    def count_within(self, x, y, radius):
+        return sum(1 for _ in self.within(x, y, radius))
+
+    def colliding(self, x, y, radius=10):
+        return list(self.within(x, y, radius))
@@ -0,0 +1,259 @@
+# simulation/summary.py
+import json
+import math
+import os
+import numpy as np
+from simulation.log import get_logger
+
+log = get_logger("summary")
+
+# Per-dot values summarised every generation, named as in the report
+METRICS = ("food_eaten", "highest_food", "lifetime_steps")
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+def summary_path(report_path):
+    return os.path.splitext(report_path)[0] + ".summary.jsonl"
+
+class RunningStats:
+    # Count, mean, variance, min and max, updated a batch at a time and
+    # mergeable (Chan et al.'s pairwise update), so generations can be
+    # combined without the values they came from.
+    def __init__(self, count=0, mean=0.0, m2=0.0, low=math.inf, high=-math.inf):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = low
+        self.max = high
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values):
+            self.merge(RunningStats(len(values), float(values.mean()), float(((values - values.mean())**2).sum()),
+                                    float(values.min()), float(values.max())))
+
+    def merge(self, other):
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else 0.0
+
+    def to_dict(self):
+        if not self.count:
+            return {"count": 0}
+        return {"count": self.count, "mean": self.mean, "var": self.variance, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        if not data.get("count"):
+            return cls()
+        return cls(data["count"], data["mean"], data["var"] * data["count"], data["min"], data["max"])
+
+class QuantileSketch:
+    # Log-bucketed quantile sketch (DDSketch): every value lands in a bucket
+    # whose bounds are within `relative_accuracy` of each other, so any
+    # quantile is returned with that relative error. Buckets are sparse and
+    # sketches with the same accuracy merge by adding counts.
+    def __init__(self, relative_accuracy=0.01, min_value=1e-9):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.positive = {}
+        self.negative = {}
+        self.zero = 0
+        self.count = 0
+
+    def _update(self, store, magnitudes):
+        keys = np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+        for key, n in zip(*(a.tolist() for a in np.unique(keys, return_counts=True))):
+            store[key] = store.get(key, 0) + n
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self._update(self.positive, values[values > self.min_value])
+        self._update(self.negative, -values[values < -self.min_value])
+        self.zero += int(np.count_nonzero(np.abs(values) <= self.min_value))
+        self.count += len(values)
+
+    def merge(self, other):
+        for store, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, n in theirs.items():
+                store[key] = store.get(key, 0) + n
+        self.zero += other.zero
+        self.count += other.count
+
+    def _value(self, key):
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return None
+
+    def to_dict(self):
+        return {"accuracy": self.relative_accuracy, "zero": self.zero,
+                "positive": sorted(self.positive.items()), "negative": sorted(self.negative.items())}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["accuracy"])
+        sketch.positive = {int(k): n for k, n in data["positive"]}
+        sketch.negative = {int(k): n for k, n in data["negative"]}
+        sketch.zero = data["zero"]
+        sketch.count = sketch.zero + sum(sketch.positive.values()) + sum(sketch.negative.values())
+        return sketch
+
+def summarise(values, relative_accuracy=0.01):
+    # Moments, quantiles and the sketch of one metric for one generation
+    stats = RunningStats()
+    stats.add(values)
+    sketch = QuantileSketch(relative_accuracy)
+    sketch.add(values)
+    entry = stats.to_dict()
+    entry["quantiles"] = {str(q): sketch.quantile(q) for q in QUANTILES}
+    entry["sketch"] = sketch.to_dict()
+    return entry
+
+class SummaryWriter:
+    # Appends one small JSON line per generation: population counts, what
+    # ended the generation, and summarise() of every metric. The file is
+    # opened on the first record and replaces any earlier run's file unless
+    # truncate() resumed it; `records` keeps this run's lines in memory.
+    def __init__(self, path, relative_accuracy=0.01):
+        self.path = path
+        self.relative_accuracy = relative_accuracy
+        self.records = []
+        self._file = None
+        self._mode = 'w'
+
+    @property
+    def latest(self):
+        return self.records[-1] if self.records else None
+
+    def record(self, generation, alive, metrics, **fields):
+        # alive is a boolean array over the dots of the generation; metrics
+        # maps every name in METRICS to an array of the same length
+        alive = np.asarray(alive, dtype=bool)
+        record = {"generation": generation, "population": len(alive),
+                  "alive": int(alive.sum()), "dead": int(len(alive) - alive.sum())}
+        record.update(fields)
+        for name in METRICS:
+            record[name] = summarise(metrics[name], self.relative_accuracy)
+        self.records.append(record)
+        if self.path is not None:
+            if self._file is None:
+                self._file = open(self.path, self._mode)
+                log.info("Writing generation summaries to %s.", self.path)
+            self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._file.flush()
+        return record
+
+    def tell(self):
+        # Size of the summary file as far as this run is concerned
+        if self._file is not None:
+            self._file.flush()
+            return self._file.tell()
+        if self._mode == 'a' and self.path is not None and os.path.exists(self.path):
+            return os.path.getsize(self.path)
+        return 0
+
+    def truncate(self, size=None):
+        # Drops records written after a checkpoint (all of the file is kept
+        # when size is None); later records are appended
+        self.close()
+        if size is not None and self.path is not None and os.path.exists(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(size)
+        self._mode = 'a'
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class Summary:
+    # Reader for a summary file, or for SummaryWriter.records. Everything is
+    # O(generations): series() gives one value per generation and merged()
+    # combines generations into run-level moments and quantiles.
+    def __init__(self, records):
+        # A generation written twice (e.g. a rerun into the same file) keeps its last record
+        by_generation = {r["generation"]: r for r in records}
+        self.records = [by_generation[g] for g in sorted(by_generation)]
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls([json.loads(line) for line in f if line.strip()])
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def generations(self):
+        return np.array([r["generation"] for r in self.records], dtype=np.int64)
+
+    def series(self, name, field=None):
+        # series("alive"), series("food_eaten", "mean"), series("lifetime_steps", "0.5")
+        values = []
+        for r in self.records:
+            value = r.get(name)
+            if field is not None:
+                value = value["quantiles"].get(field) if field in value.get("quantiles", {}) else value.get(field)
+            values.append(np.nan if value is None else value)
+        return np.array(values, dtype=np.float64)
+
+    def merged(self, name, first=None, last=None):
+        # (RunningStats, QuantileSketch) over generations first..last
+        stats = RunningStats()
+        sketch = None
+        for r in self.records:
+            if (first is not None and r["generation"] < first) or (last is not None and r["generation"] > last):
+                continue
+            stats.merge(RunningStats.from_dict(r[name]))
+            part = QuantileSketch.from_dict(r[name]["sketch"])
+            if sketch is None:
+                sketch = part
+            else:
+                sketch.merge(part)
+        return stats, sketch if sketch is not None else QuantileSketch()
+
+    def to_frame(self):
+        # One row per generation with flat columns such as food_eaten_mean
+        # and lifetime_steps_p50; needs pandas
+        import pandas as pd
+        rows = []
+        for r in self.records:
+            row = {k: v for k, v in r.items() if not isinstance(v, dict)}
+            for name in METRICS:
+                entry = r[name]
+                for field in ("count", "mean", "var", "min", "max"):
+                    row[f"{name}_{field}"] = entry.get(field)
+                for q, value in entry.get("quantiles", {}).items():
+                    row[f"{name}_p{round(float(q) * 100):02d}"] = value
+            rows.append(row)
+        return pd.DataFrame(rows).set_index("generation")
+
+def load_summary(path):
+    return Summary.load(path)
@@ -0,0 +1,98 @@
+# simulation/termination.py
+import numpy as np
+
+# Every policy is checked after each step and says whether the generation
+# should end now. reset() is called when a generation starts.
+
+class AllDead:
+    # Nothing can change once every dot has died
+    name = "all_dead"
+
+    def reset(self, simulation):
+        pass
+
+    def check(self, simulation):
+        return not simulation.dots
+
+class FoodExhausted:
+    # Every food item on the board has been eaten
+    name = "food_exhausted"
+
+    def reset(self, simulation):
+        pass
+
+    def check(self, simulation):
+        return len(simulation.foods) == 0
+
+class StableRankings:
+    # The order of the living dots by food_eaten (only the first `top` of
+    # them if given) has not changed for `steps` consecutive steps
+    name = "stable_rankings"
+
+    def __init__(self, steps=100, top=None):
+        self.steps = steps
+        self.top = top
+        self._order = None
+        self._stable = 0
+
+    def reset(self, simulation):
+        self._order = None
+        self._stable = 0
+
+    def check(self, simulation):
+        world = simulation.world
+        living = world.living()
+        order = world.ids[living][np.argsort(-world.food_eaten[living], kind="stable")]
+        if self.top is not None:
+            order = order[:self.top]
+        if self._order is not None and np.array_equal(order, self._order):
+            self._stable += 1
+        else:
+            self._stable = 0
+        self._order = order
+        return self._stable >= self.steps
+
+POLICIES = {cls.name: cls for cls in (AllDead, FoodExhausted, StableRankings)}
+
+class StepCurriculum:
+    # Step budget that grows with EvolutionAlgorithm.last_best_fitness, the
+    # best fitness reached so far: `start` steps plus `steps_per_fitness` for
+    # every point of it, up to `maximum`.
+    def __init__(self, start=200, maximum=1000, steps_per_fitness=20):
+        self.start = start
+        self.maximum = maximum
+        self.steps_per_fitness = steps_per_fitness
+
+    def budget(self, algorithm):
+        grown = self.start + self.steps_per_fitness * max(algorithm.last_best_fitness, 0)
+        return int(min(self.maximum, grown))
+
+class Termination:
+    # Ends a generation when the first of `policies` fires, or at the latest
+    # after steps_per_generation steps ("budget"). With a curriculum, the
+    # budget is set again at the start of every generation.
+    def __init__(self, policies=(), curriculum=None):
+        self.policies = list(policies)
+        self.curriculum = curriculum
+
+    def reset(self, simulation):
+        for policy in self.policies:
+            policy.reset(simulation)
+        if self.curriculum is not None:
+            simulation.steps_per_generation = self.curriculum.budget(simulation.algorithm)
+
+    def check(self, simulation):
+        for policy in self.policies:
+            if policy.check(simulation):
+                return policy.name
+        if simulation.current_step >= simulation.steps_per_generation:
+            return "budget"
+        return None
+
+def make_termination(names=("all_dead",), stable_steps=100, stable_top=None, curriculum=None):
+    policies = []
+    for name in names:
+        if name not in POLICIES:
+            raise ValueError(f"Unknown termination policy {name!r}; choose from {', '.join(POLICIES)}")
+        policies.append(StableRankings(stable_steps, stable_top) if name == "stable_rankings" else POLICIES[name]())
+    return Termination(policies, curriculum)
@@ -0,0 +1,115 @@
+# simulation/world.py
+import numpy as np
+from algorithms.neural_network import NetworkBatch
+
+# One contiguous float64 row per field, one column per dot
+FIELDS = ("x", "y", "last_x", "last_y", "speed", "food_eaten", "max_food_eaten")
+X, Y, LAST_X, LAST_Y, SPEED, FOOD, MAX_FOOD = range(len(FIELDS))
+
+# Dot-food distances are computed in blocks of at most this many pairs
+PAIR_BLOCK = 1 << 16
+
+class World:
+    # Struct-of-arrays state of one population, in population order. Every Dot
+    # in it reads and writes its fields through its column (see Dot), so the
+    # step can work on whole arrays. Columns never move during a generation;
+    # a dead dot only has its `alive` flag cleared.
+    def __init__(self, dots):
+        self.dots = list(dots)
+        if len(set(map(id, self.dots))) != len(self.dots):
+            raise ValueError("A Dot can only appear once in a population")
+        n = len(self.dots)
+        self.state = np.empty((len(FIELDS), n), dtype=np.float64)
+        for column, dot in enumerate(self.dots):
+            self.state[:, column] = dot.state_values()
+        self.alive = np.ones(n, dtype=bool)
+        self.ids = np.fromiter((d.id for d in self.dots), dtype=np.int64, count=n)
+        self.batch = NetworkBatch.from_networks([d.network for d in self.dots])
+        # The list of living dots this world currently stands for
+        self.population = dots
+        for column, dot in enumerate(self.dots):
+            dot.bind(self, column)
+
+    def __len__(self):
+        return len(self.dots)
+
+    @property
+    def x(self):
+        return self.state[X]
+
+    @property
+    def y(self):
+        return self.state[Y]
+
+    @property
+    def food_eaten(self):
+        return self.state[FOOD]
+
+    @property
+    def max_food_eaten(self):
+        return self.state[MAX_FOOD]
+
+    def living(self):
+        return np.flatnonzero(self.alive)
+
+    def positions(self):
+        # (n, 2) positions of the living dots, in population order
+        rows = self.living()
+        return np.stack((self.state[X, rows], self.state[Y, rows]), axis=-1)
+
+    def bury(self, dead):
+        # Clears `alive` for the given columns and returns the new population
+        self.alive[dead] = False
+        self.population = [self.dots[i] for i in self.living().tolist()]
+        return self.population
+
+    def release(self):
+        # Hands every dot still bound here its own copy of its state
+        for column, dot in enumerate(self.dots):
+            if dot.world is self:
+                dot.unbind(self.state[:, column].tolist())
+
+def nearest_food(x, y, food_x, food_y):
+    # Index of the nearest food for every (x, y), ties going to the food added
+    # first like FoodGrid.nearest, plus how many foods lie within 50 px.
+    n, m = len(x), len(food_x)
+    nearest = np.empty(n, dtype=np.intp)
+    nearby = np.empty(n, dtype=np.intp)
+    block = max(1, PAIR_BLOCK // max(m, 1))
+    for start in range(0, n, block):
+        end = start + block
+        d2 = np.subtract.outer(x[start:end], food_x)
+        np.square(d2, out=d2)
+        dy = np.subtract.outer(y[start:end], food_y)
+        d2 += np.square(dy, out=dy)
+        nearest[start:end] = np.argmin(d2, axis=1)
+        nearby[start:end] = np.count_nonzero(d2 < 2500.0, axis=1)
+    return nearest, nearby
+
+def sense(x, y, food_level, target_x, target_y, nearby, width, height):
+    # Vectorized Dot.sense: network inputs along a new last axis, for arrays
+    # of any shape. Without any food the targets are None and the food
+    # inputs sit at the centre.
+    if target_x is None:
+        nfx = nfy = np.full(np.shape(x), 0.5)
+    else:
+        nfx, nfy = target_x / width, target_y / height
+    half_min_dim = min(width, height) / 2.0
+    min_dist_edge = np.minimum(np.minimum(x, width - x), np.minimum(y, height - y))
+    return np.stack((
+        x / width,
+        y / height,
+        nfx,
+        nfy,
+        np.minimum(food_level / 10.0, 1.0),
+        np.minimum(nearby / 10.0, 1.0),
+        np.minimum(min_dist_edge / half_min_dim, 1.0),
+    ), axis=-1)
+
+def first_per_target(candidates, targets):
+    # Candidates (in step order) that are the first to reach their target, so
+    # when several dots land on the same food the earliest one eats it
+    if not len(candidates):
+        return candidates
+    _, first = np.unique(targets[candidates], return_index=True)
+    return candidates[np.sort(first)]